@@ -0,0 +1,98 @@
+"""Checkout latency vs. cart size.
+
+Compares the old per-item check/update path with checkout.reserve_stock on a
+throwaway copy of the default database.
+
+    python bench/bench_checkout.py [--runs 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+from checkout import reserve_stock  # noqa: E402
+
+CART_SIZES = (1, 2, 5, 10, 20, 50)
+
+
+def legacy_checkout(cart_items):
+    """The pre-engine path: one SELECT and one UPDATE per item and add-on"""
+    conn = database.get_db_connection()
+    try:
+        for item in cart_items:
+            conn.execute("SELECT stock FROM menu WHERE name = ?", (item['product_name'],)).fetchone()
+            for addon in item['addons']:
+                conn.execute("SELECT stock FROM addons WHERE name = ?", (addon,)).fetchone()
+    finally:
+        conn.close()
+    conn = database.get_db_connection()
+    try:
+        for item in cart_items:
+            conn.execute("UPDATE menu SET stock = stock - 1 WHERE name = ?", (item['product_name'],))
+            for addon in item['addons']:
+                conn.execute("UPDATE addons SET stock = stock - 1 WHERE name = ?", (addon,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def random_cart(rng, products, addons, size):
+    cart = []
+    for _ in range(size):
+        name, category = rng.choice(products)
+        choices = addons.get(category, [])
+        cart.append({
+            'product_name': name,
+            'addons': rng.sample(choices, k=min(len(choices), rng.randint(0, 2))),
+        })
+    return cart
+
+
+def measure(fn, carts):
+    timings = []
+    for cart in carts:
+        start = time.perf_counter()
+        fn(cart)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            database.init_db()
+            with database.db_connection() as conn:
+                conn.execute("UPDATE menu SET stock = 100000000")
+                conn.execute("UPDATE addons SET stock = 100000000")
+                products = conn.execute("SELECT name, category FROM menu").fetchall()
+                addons = {}
+                for name, category in conn.execute("SELECT name, category FROM addons"):
+                    addons.setdefault(category, []).append(name)
+
+            rng = random.Random(42)
+            print(f"{'cart size':>9} | {'legacy p50':>10} {'p95':>8} | {'engine p50':>10} {'p95':>8}  (ms)")
+            for size in CART_SIZES:
+                carts = [random_cart(rng, products, addons, size) for _ in range(args.runs)]
+                legacy = measure(legacy_checkout, carts)
+                engine = measure(reserve_stock, carts)
+                print(f"{size:>9} | {legacy[0]:>10.3f} {legacy[1]:>8.3f} | {engine[0]:>10.3f} {engine[1]:>8.3f}")
+        finally:
+            database.connection_manager.close_all()
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Lunch-rush load test of the real order path.
+
+Seeds a throwaway database with database.init_db, then replays a rush of
+synthetic carts drawn from the default menu through OrderService: the
+same add_to_cart pricing, checkout, prepare_next_order and serve_order
+logic the till uses. The kitchen works --kitchen-lag orders behind the
+counter. Reports p50/p95/p99 latency per step, orders/sec and SQL
+statements per order (trigger statements included), and can save the
+results as JSON and compare them with an earlier run.
+
+    python bench/bench_lunch_rush.py [--orders 2000] [--json out.json] [--baseline old.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+from catalog import MenuCatalog  # noqa: E402
+from order_service import OrderService  # noqa: E402
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def summarize(timings_ms):
+    values = sorted(timings_ms)
+    summary = {f"p{pct}": round(percentile(values, pct), 3) for pct in PERCENTILES}
+    summary["max"] = round(values[-1], 3) if values else 0.0
+    summary["count"] = len(values)
+    return summary
+
+
+class StatementCounter:
+    """Counts statements SQLite runs on a connection, via the trace hook"""
+
+    def __init__(self, conn):
+        self.count = 0
+        conn.set_trace_callback(self._trace)
+
+    def _trace(self, _statement):
+        self.count += 1
+
+
+class CartGenerator:
+    """Random carts shaped like a lunch queue, from the seeded menu"""
+
+    def __init__(self, catalog, args):
+        self.rng = random.Random(args.seed)
+        self.args = args
+        self.products = [p for p in catalog.all_products() if p.stock > 0]
+        self.addons = {}
+        for product in self.products:
+            if product.category not in self.addons:
+                self.addons[product.category] = [
+                    a.name for a in catalog.addons_for_category(product.category)]
+
+    def cart(self):
+        rng, args = self.rng, self.args
+        lines = []
+        for _ in range(rng.randint(1, args.max_items)):
+            product = rng.choice(self.products)
+            choices = self.addons.get(product.category, [])
+            addons = [a for a in choices if rng.random() < args.addon_rate]
+            lines.append((product.name,
+                          "Large" if rng.random() < args.large else "Regular",
+                          rng.choice(("Hot", "Cold")),
+                          addons))
+        takeout = rng.random() < args.takeout
+        return (lines,
+                "Take-out" if takeout else "Dine-in",
+                rng.choice(("Standard", "Premium")) if takeout else "None")
+
+
+def timed(timings, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    timings.append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def run_rush(args):
+    service = OrderService(MenuCatalog())
+    with database.db_connection() as conn:
+        # Enough stock that the rush measures throughput, not sell-outs
+        conn.execute("UPDATE menu SET stock = ?", (args.orders * args.max_items + 1000,))
+        conn.execute("UPDATE addons SET stock = ?", (args.orders * args.max_items + 1000,))
+    service.catalog.load()
+    service.load()
+    generator = CartGenerator(service.catalog, args)
+    carts = [generator.cart() for _ in range(args.orders)]
+
+    counter = StatementCounter(database.connection_manager.get())
+    timings = {"add_to_cart": [], "checkout": [], "prepare": [], "serve": [], "order": []}
+    shortages = 0
+
+    start = time.perf_counter()
+    for lines, service_type, packaging in carts:
+        order_start = time.perf_counter()
+        for name, size, temperature, addons in lines:
+            timed(timings["add_to_cart"], service.add_item, name, size, temperature, addons)
+        result = timed(timings["checkout"], service.checkout, service_type, packaging)
+        if not result.ok:
+            shortages += 1
+            service.clear_cart()
+        timings["order"].append((time.perf_counter() - order_start) * 1000)
+
+        if len(service.open_orders) > args.kitchen_lag:
+            timed(timings["prepare"], service.prepare_next)
+            timed(timings["serve"], service.serve_next)
+
+    # Close of rush: the kitchen clears what is still queued
+    while service.open_orders:
+        timed(timings["prepare"], service.prepare_next)
+        if timed(timings["serve"], service.serve_next) is None:
+            break
+    elapsed = time.perf_counter() - start
+    database.connection_manager.get().set_trace_callback(None)
+
+    return {
+        "orders": args.orders,
+        "shortages": shortages,
+        "elapsed_s": round(elapsed, 3),
+        "orders_per_sec": round(args.orders / elapsed, 1),
+        "sql_statements_per_order": round(counter.count / args.orders, 2),
+        "latency_ms": {step: summarize(values) for step, values in timings.items()},
+    }
+
+
+def environment():
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "revision": revision,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def print_results(results, baseline=None):
+    def delta(now, before):
+        if not before:
+            return ""
+        return f" ({(now - before) / before * 100:+.1f}%)"
+
+    base = baseline["results"] if baseline else {}
+    print(f"orders/sec: {results['orders_per_sec']}"
+          f"{delta(results['orders_per_sec'], base.get('orders_per_sec'))}")
+    print(f"SQL statements/order: {results['sql_statements_per_order']}"
+          f"{delta(results['sql_statements_per_order'], base.get('sql_statements_per_order'))}")
+    print(f"{'step':>12} | " + " | ".join(f"{f'p{p} ms':>14}" for p in PERCENTILES))
+    for step, summary in results["latency_ms"].items():
+        before = base.get("latency_ms", {}).get(step, {})
+        cells = [f"{summary[f'p{p}']:.3f}{delta(summary[f'p{p}'], before.get(f'p{p}'))}"
+                 for p in PERCENTILES]
+        print(f"{step:>12} | " + " | ".join(f"{cell:>14}" for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--max-items", type=int, default=4, help="lines per cart, 1..N")
+    parser.add_argument("--addon-rate", type=float, default=0.25,
+                        help="chance each offered add-on is picked")
+    parser.add_argument("--large", type=float, default=0.3, help="share of Large lines")
+    parser.add_argument("--takeout", type=float, default=0.4, help="share of take-out orders")
+    parser.add_argument("--kitchen-lag", type=int, default=10,
+                        help="orders waiting before the kitchen takes the next one")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="earlier --json output to compare against")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    json_path = os.path.abspath(args.json) if args.json else None
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            database.init_db()
+            results = run_rush(args)
+        finally:
+            database.connection_manager.close_all()
+            os.chdir(cwd)
+
+    config = {key: value for key, value in vars(args).items() if key not in ("json", "baseline")}
+    print_results(results, baseline)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "config": config, "results": results}, f, indent=2)
+        print(f"Saved {json_path}")
+
+
+if __name__ == "__main__":
+    main()
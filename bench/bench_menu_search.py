@@ -0,0 +1,104 @@
+"""Menu search on a synthetic catalog: LIKE vs. menu_fts vs. the in-memory index.
+
+Builds a throwaway database with --rows products, then times each search
+term through the old LOWER(name) LIKE query, MenuFtsSearch and
+MenuSearchIndex, and checks that all three return the same products.
+
+    python bench/bench_menu_search.py [--rows 100000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+from catalog import MenuCatalog  # noqa: E402
+from menu_search import MenuFtsSearch, MenuSearchIndex, menu_fts_enabled  # noqa: E402
+
+WORDS = ("Iced", "Hot", "Vanilla", "Caramel", "Hazelnut", "Matcha", "Mocha", "Latte",
+         "Espresso", "Cold Brew", "Chai", "Berry", "Almond", "Oat", "Honey", "Lemon",
+         "Croissant", "Muffin", "Bagel", "Panini", "Cheesecake", "Smoothie", "Frappe")
+SECTIONS = (("Coffee", "Hot Coffee"), ("Coffee", "Cold Coffee"), ("Tea", "Hot Tea"),
+            ("Tea", "Cold Tea"), ("Sweet Treats", "Pastry"), ("Food", "Sandwich"))
+TERMS = (("la", None), ("latte", None), ("vanilla mocha", None),
+         ("hazelnut", "Coffee"), ("cheesecake 12", None), ("zzz", None))
+
+LIKE_SQL = ("SELECT id FROM menu WHERE 1=1{filters} AND LOWER(name) LIKE ? "
+            "ORDER BY category, subcategory, name, id")
+
+
+def populate(conn, rows):
+    rng = random.Random(42)
+    conn.executemany(
+        "INSERT INTO menu (name, category, subcategory, price, stock) VALUES (?, ?, ?, ?, ?)",
+        ((f"{' '.join(rng.sample(WORDS, 3))} {i}", *rng.choice(SECTIONS), 100, i % 20)
+         for i in range(rows))
+    )
+
+
+def like_search(term, category):
+    filters, params = "", []
+    if category is not None:
+        filters, params = " AND category = ?", [category]
+    with database.db_connection() as conn:
+        return [row[0] for row in conn.execute(
+            LIKE_SQL.format(filters=filters), [*params, f"%{term}%"]).fetchall()]
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            database.init_db()
+            if not menu_fts_enabled():
+                print("This SQLite build has no FTS5 trigram tokenizer; nothing to compare")
+                return
+            with database.db_connection() as conn:
+                populate(conn, args.rows)
+
+            catalog = MenuCatalog()
+            catalog.load()
+            fts = MenuFtsSearch(catalog)
+            index = MenuSearchIndex(catalog)
+            start = time.perf_counter()
+            index.search("")
+            print(f"{len(catalog.all_products())} products; in-memory index built in "
+                  f"{time.perf_counter() - start:.2f}s")
+
+            print(f"{'term':>16} | {'hits':>6} | {'LIKE ms':>8} | {'FTS ms':>8} | {'index ms':>8}")
+            for term, category in TERMS:
+                like_ids, like_ms = timed(lambda: like_search(term, category), args.repeat)
+                fts_hits, fts_ms = timed(lambda: fts.search(term, category), args.repeat)
+                index_hits, index_ms = timed(lambda: index.search(term, category), args.repeat)
+                # Exact matches must agree; when LIKE finds nothing both fall back to fuzzy
+                if like_ids:
+                    assert [p.id for p in fts_hits] == like_ids, term
+                    assert [p.id for p in index_hits] == like_ids, term
+                print(f"{term:>16} | {len(fts_hits):>6} | {like_ms:>8.2f} | {fts_ms:>8.2f} | {index_ms:>8.2f}")
+        finally:
+            database.connection_manager.close_all()
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Queue tab redraw cost vs. queue length.
+
+Times one status change (the prepare/serve case) rendered by the old
+delete-all/re-insert redraw and by QueueView.sync. Needs a display.
+
+    python bench/bench_queue_redraw.py [--repeat 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from queue_tab import QueueView, queue_row  # noqa: E402
+
+QUEUE_SIZES = (10, 100, 250, 500, 1000, 2000)
+
+
+def make_orders(count):
+    return {
+        order_id: {
+            "id": order_id,
+            "customer": f"#{order_id}",
+            "items": [{'product_name': "Latte"}, {'product_name': "Croissant"}],
+            "service": "Dine-in",
+            "packaging": "None",
+            "status": "Waiting",
+        }
+        for order_id in range(1, count + 1)
+    }
+
+
+def full_redraw(tree, orders):
+    for item in tree.get_children():
+        tree.delete(item)
+    for order in orders.values():
+        tree.insert("", "end", values=queue_row(order))
+
+
+def time_changes(root, orders, redraw, repeat):
+    timings = []
+    ids = list(orders)
+    for i in range(repeat):
+        order = orders[ids[i % len(ids)]]
+        order["status"] = "Preparing" if order["status"] == "Waiting" else "Waiting"
+        start = time.perf_counter()
+        redraw(orders)
+        root.update_idletasks()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    columns = ("Customer", "Order", "Service", "Packaging", "Status")
+    print(f"{'orders':>7} | {'full redraw':>12} | {'diff sync':>10}  (ms per change, median)")
+    for size in QUEUE_SIZES:
+        orders = make_orders(size)
+
+        tree = ttk.Treeview(root, columns=columns, show="headings")
+        tree.pack()
+        full_redraw(tree, orders)
+        full = time_changes(root, orders, lambda o: full_redraw(tree, o), args.repeat)
+        tree.destroy()
+
+        tree = ttk.Treeview(root, columns=columns, show="headings")
+        tree.pack()
+        view = QueueView(tree)
+        view.sync(orders)
+        diff = time_changes(root, orders, view.sync, args.repeat)
+        tree.destroy()
+
+        print(f"{size:>7} | {full:>12.3f} | {diff:>10.3f}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
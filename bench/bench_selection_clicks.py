@@ -0,0 +1,100 @@
+"""Product clicks per second: destroy/recreate vs. pooled widgets.
+
+Replays product selections against the selected-product banner and add-on
+list, once with the old build-everything-per-click code and once with
+SelectedProductBanner/AddonList. Needs a display.
+
+    python bench/bench_selection_clicks.py [--clicks 300]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import customtkinter as ctk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import Addon, Product  # noqa: E402
+from database import DEFAULT_ADDONS, DEFAULT_MENU  # noqa: E402
+from image_manager import ImageManager  # noqa: E402
+from pos_tab import AddonList, SelectedProductBanner  # noqa: E402
+
+
+class Harness:
+    """Just enough of CafeShopSystem for the banner and add-on list"""
+
+    def __init__(self, root, images_dir):
+        self.root = root
+        self.image_manager = ImageManager(images_dir)
+        self.selected_product_frame = ctk.CTkFrame(root, height=60)
+        self.selected_product_frame.pack(fill="x")
+        self.addons_container = ctk.CTkScrollableFrame(root, height=120)
+        self.addons_container.pack(fill="both", expand=True)
+
+
+def legacy_click(app, product, addons):
+    for widget in app.selected_product_frame.winfo_children():
+        widget.destroy()
+    info_frame = ctk.CTkFrame(app.selected_product_frame)
+    info_frame.pack(fill="both", expand=True, padx=5, pady=5)
+    photo = app.image_manager.get_image_preview(product.image_path, size=(45, 45))
+    ctk.CTkLabel(info_frame, image=photo, text="").pack(side="left", padx=8)
+    details_frame = ctk.CTkFrame(info_frame)
+    details_frame.pack(side="left", fill="both", expand=True, padx=8)
+    for row, text in enumerate((f"Selected: {product.name}", f"Price: ₱{product.price}",
+                                f"Stock: {product.stock}", f"Type: {product.subcategory}")):
+        ctk.CTkLabel(details_frame, text=text).grid(row=row, column=0, sticky="w", pady=1)
+
+    for widget in app.addons_container.winfo_children():
+        widget.destroy()
+    for addon in addons:
+        ctk.CTkCheckBox(app.addons_container, text=f"{addon.name} (+₱{addon.price})",
+                        variable=ctk.BooleanVar()).pack(anchor="w", pady=2)
+
+
+def pooled_click(app, product, addons):
+    app.selected_banner.show(product, product.subcategory, "☕")
+    app.addon_list.show(addons)
+
+
+def run(root, app, click, products, addons_by_category, clicks):
+    start = time.perf_counter()
+    for i in range(clicks):
+        product = products[i % len(products)]
+        click(app, product, addons_by_category.get(product.category, []))
+        root.update_idletasks()
+    return clicks / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clicks", type=int, default=300)
+    args = parser.parse_args()
+
+    products = [Product(i, name, category, subcategory, price, stock, None)
+                for i, (name, category, subcategory, price, stock, _image)
+                in enumerate(DEFAULT_MENU, start=1)]
+    addons_by_category = {}
+    for i, (name, category, price, stock) in enumerate(DEFAULT_ADDONS, start=1):
+        addons_by_category.setdefault(category, []).append(Addon(i, name, category, price, stock))
+
+    root = ctk.CTk()
+    with tempfile.TemporaryDirectory() as images_dir:
+        app = Harness(root, images_dir)
+        before = run(root, app, legacy_click, products, addons_by_category, args.clicks)
+
+        for widget in app.selected_product_frame.winfo_children() + app.addons_container.winfo_children():
+            widget.destroy()
+        app.selected_banner = SelectedProductBanner(app, app.selected_product_frame)
+        app.addon_list = AddonList(app.addons_container)
+        after = run(root, app, pooled_click, products, addons_by_category, args.clicks)
+    root.destroy()
+
+    print(f"destroy/recreate: {before:8.1f} clicks/s")
+    print(f"pooled widgets:   {after:8.1f} clicks/s  ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
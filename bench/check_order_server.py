@@ -0,0 +1,98 @@
+"""Check that one bad command cannot spoil an order server batch.
+
+Drives OrderServer._apply directly against a freshly migrated database with
+a batch mixing valid orders (one of them an iced drink), a malformed one
+and one whose handler fails after it has written and touched memory. Exits non-zero unless the valid
+orders are committed and the server's in-memory queue, numbering and stock
+match the database afterwards.
+
+    python bench/check_order_server.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+from catalog import MenuCatalog  # noqa: E402
+from order_server import OrderServer, _Command  # noqa: E402
+from order_service import OrderService  # noqa: E402
+
+
+def order(product, addons=(), temperature="Hot"):
+    return {"items": [{"product_name": product, "addons": list(addons),
+                       "temperature": temperature}],
+            "service": "Dine-in"}
+
+
+def check(failures, label, ok):
+    print(f"{'ok  ' if ok else 'FAIL'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def run_checks():
+    service = OrderService(MenuCatalog())
+    service.catalog.load()
+    service.load()
+    server = OrderServer(service)
+    product = service.catalog.all_products()[0].name
+    stock_before = service.catalog.product(product).stock
+
+    def place_then_fail(body):
+        server._place(body)
+        raise RuntimeError("handler failed after writing")
+
+    batch = [
+        _Command(server._place, order(product), True, None),
+        _Command(server._place, order(product, [{}]), True, None),
+        _Command(place_then_fail, order(product), True, None),
+        _Command(server._place, order(product), True, None),
+        _Command(server._place, order("Iced Latte", temperature="Iced"), True, None),
+    ]
+    results = server._apply(batch)
+    statuses = [status for status, _payload in results]
+    print("statuses:", statuses)
+
+    failures = []
+    check(failures, "valid orders placed", statuses[0] == 201 and statuses[3] == 201)
+    check(failures, "iced drink accepted", statuses[4] == 201)
+    check(failures, "non-string add-on rejected as a bad request", statuses[1] == 400)
+    check(failures, "failing handler reported as an error", statuses[2] == 500)
+
+    with database.db_connection() as conn:
+        rows = conn.execute(
+            "SELECT id, customer_number FROM orders ORDER BY id").fetchall()
+        stock = conn.execute("SELECT stock FROM menu WHERE name = ?", (product,)).fetchone()[0]
+        iced = conn.execute(
+            "SELECT temperature FROM sales_history WHERE product_name = 'Iced Latte'").fetchall()
+    check(failures, "only the three valid orders committed", len(rows) == 3)
+    check(failures, "iced drink saved as Iced", iced == [("Iced",)])
+    check(failures, "open queue matches the database",
+          sorted(service.open_orders) == [order_id for order_id, _customer in rows])
+    check(failures, "database stock down by two", stock == stock_before - 2)
+    check(failures, "in-memory stock matches the database",
+          service.catalog.product(product).stock == stock)
+    check(failures, "customer numbering continues from the database",
+          service.customer_number == service.queue_store.next_customer_number())
+
+    server.close()
+    return failures
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            database.init_db()
+            failures = run_checks()
+            database.connection_manager.close_all()
+        finally:
+            os.chdir(cwd)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Assert that every hot query in the app is answered from an index.
+
+Runs EXPLAIN QUERY PLAN for each query below against a freshly migrated
+database and exits non-zero if any of them falls back to a full table scan.
+Keep HOT_QUERIES in sync with the SQL the app issues: catalog.py,
+menu_search.py, checkout.py, order_store.py and inventory_tab.py (main.py
+reads the menu from MenuCatalog and the search index, not SQL).
+
+    python bench/check_query_plans.py [--rows 100000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+
+HOT_QUERIES = {
+    "MenuCatalog.load (menu)": (
+        "SELECT id, name, category, subcategory, price, stock, image_path, is_available FROM menu",
+        ()),
+    "MenuCatalog.load (addons)": (
+        "SELECT id, name, category, price, stock, is_available FROM addons", ()),
+    "MenuCatalog.refresh_product": (
+        "SELECT id, name, category, subcategory, price, stock, image_path, is_available "
+        "FROM menu WHERE id = ?", (1,)),
+    "menu search (FTS)": (
+        "SELECT m.id FROM menu_fts CROSS JOIN menu m ON m.id = menu_fts.rowid "
+        "WHERE menu_fts MATCH ? ORDER BY m.category, m.subcategory, m.name, m.id",
+        ('name : "lat"',)),
+    "menu search (FTS, category + subcategory)": (
+        "SELECT m.id FROM menu_fts CROSS JOIN menu m ON m.id = menu_fts.rowid "
+        "WHERE menu_fts MATCH ? AND m.category = ? AND m.subcategory = ? "
+        "ORDER BY m.category, m.subcategory, m.name, m.id",
+        ('name : "lat"', "Coffee", "Hot Coffee")),
+    "menu search (FTS fuzzy)": (
+        "SELECT m.id, m.name FROM menu_fts CROSS JOIN menu m ON m.id = menu_fts.rowid "
+        "WHERE menu_fts MATCH ? ORDER BY rank LIMIT ?",
+        ('name : ("lat" OR "ate")', 200)),
+    "reserve_stock (menu shortages)": (
+        "WITH needed(name, quantity) AS (VALUES (?, ?)) "
+        "SELECT needed.name, needed.quantity, COALESCE(t.stock, 0) "
+        "FROM needed LEFT JOIN menu t ON t.name = needed.name "
+        "WHERE t.stock IS NULL OR t.stock < needed.quantity", ("Latte", 1)),
+    "reserve_stock (menu decrement)": (
+        "WITH needed(name, quantity) AS (VALUES (?, ?)) "
+        "UPDATE menu SET stock = stock - (SELECT quantity FROM needed WHERE needed.name = menu.name) "
+        "WHERE name IN (SELECT name FROM needed) "
+        "AND stock >= (SELECT quantity FROM needed WHERE needed.name = menu.name)", ("Latte", 1)),
+    "OrderQueueStore.open_orders (headers)": (
+        "SELECT id, customer_number, service_type, packaging_type, total, status "
+        "FROM orders WHERE id IN (SELECT id FROM orders WHERE status IN (?, ?)) ORDER BY id",
+        ("Waiting", "Preparing")),
+    "OrderQueueStore.open_orders (lines)": (
+        "SELECT order_id, product_name, addon_name, unit_price, size, temperature "
+        "FROM sales_history WHERE order_id IN "
+        "(SELECT id FROM orders WHERE status IN (?, ?)) ORDER BY order_id, id",
+        ("Waiting", "Preparing")),
+    "reserve_stock (add-on shortages)": (
+        "WITH needed(name, quantity) AS (VALUES (?, ?)) "
+        "SELECT needed.name, needed.quantity, COALESCE(t.stock, 0) "
+        "FROM needed LEFT JOIN addons t ON t.name = needed.name "
+        "WHERE t.stock IS NULL OR t.stock < needed.quantity", ("Honey", 1)),
+    "inventory menu page": (
+        "SELECT id, name, category, subcategory, price, stock FROM menu WHERE name > ? "
+        "ORDER BY name LIMIT ?", ("Latte", 100)),
+    "inventory add-on page": (
+        "SELECT id, name, category, price, stock FROM addons WHERE (name, id) > (?, ?) "
+        "ORDER BY name, id LIMIT ?", ("Honey", 3, 100)),
+    "inventory low stock page": (
+        "SELECT stock, kind, id, name, category FROM ("
+        "SELECT stock, 0 AS kind, id, name, category FROM menu WHERE stock < ? UNION ALL "
+        "SELECT stock, 1 AS kind, id, name, category FROM addons WHERE stock < ?) "
+        "WHERE (stock, kind, id) > (?, ?, ?) ORDER BY stock, kind, id LIMIT ?",
+        (10, 10, 2, 0, 40, 100)),
+    "export orders (date range)": (
+        "SELECT * FROM orders WHERE order_time >= ? AND order_time < ? ORDER BY order_time, id",
+        ("2026-01-01", "2026-02-01")),
+    "export sales_history (date range)": (
+        "SELECT * FROM sales_history WHERE sale_time >= ? AND sale_time < ? ORDER BY sale_time, id",
+        ("2026-01-01", "2026-02-01")),
+    "advance": (
+        "SELECT id FROM orders WHERE status = ? ORDER BY id LIMIT 1", ("Waiting",)),
+    "show_sales_report (totals)": (
+        "SELECT SUM(order_count), SUM(revenue) FROM sales_daily", ()),
+    "show_sales_report (popular)": (
+        "SELECT product_name, SUM(quantity) AS sold FROM product_sales_daily "
+        "GROUP BY product_name ORDER BY sold DESC LIMIT ?", (5,)),
+    "show_sales_report (busiest hours)": (
+        "SELECT substr(hour, 12, 2) AS hour_of_day, SUM(order_count) AS served FROM sales_hourly "
+        "WHERE hour <> 'unknown' GROUP BY hour_of_day ORDER BY served DESC LIMIT ?", (3,)),
+}
+
+# Rollup tables hold one row per hour/day bucket, so reading them whole is the point
+ROLLUP_TABLES = ("sales_hourly", "sales_daily", "product_sales_daily")
+# Queries that read every row on purpose: the catalog is loaded once at start-up
+FULL_READS = ("MenuCatalog.load (menu)", "MenuCatalog.load (addons)")
+
+
+def full_scans(conn, sql, params):
+    """Plan lines that read a whole table without an index"""
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    details = [row[-1] for row in plan]
+    return [d for d in details
+            if d.startswith("SCAN ") and "USING" not in d and "CONSTANT ROW" not in d
+            and "VIRTUAL TABLE INDEX" not in d
+            and not d.startswith("SCAN needed")
+            and not d.startswith(tuple(f"SCAN {table}" for table in ROLLUP_TABLES))], details
+
+
+def inflate(conn, rows):
+    """Pad menu and orders with synthetic rows so the planner sees real sizes"""
+    conn.executemany(
+        "INSERT INTO menu (name, category, subcategory, price, stock) VALUES (?, ?, ?, ?, ?)",
+        ((f"Synthetic {i}", f"Category {i % 50}", f"Sub {i % 7}", 50, i % 3) for i in range(rows))
+    )
+    conn.executemany(
+        "INSERT INTO orders (customer_number, order_name, total, status, order_time) "
+        "VALUES (?, ?, ?, ?, datetime('now'))",
+        ((f"#{i}", f"Latte {i % 100}", 80, "Served" if i % 4 else "Waiting") for i in range(rows))
+    )
+    conn.execute("ANALYZE")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=0,
+                        help="synthetic menu/orders rows to add before planning")
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            database.init_db()
+            with database.db_connection() as conn:
+                if args.rows:
+                    inflate(conn, args.rows)
+                for name, (sql, params) in HOT_QUERIES.items():
+                    scans, details = full_scans(conn, sql, params)
+                    if name in FULL_READS:
+                        status = "full read"
+                    else:
+                        status = "FULL SCAN" if scans else "ok"
+                        failures += bool(scans)
+                    print(f"{status:>9}  {name}: {' | '.join(details)}")
+        finally:
+            database.connection_manager.close_all()
+            os.chdir(cwd)
+
+    if failures:
+        print(f"{failures} hot queries are not using an index")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+from database import db_connection
+
+
+class Product:
+    """One row of the menu table"""
+    __slots__ = ("id", "name", "category", "subcategory", "price",
+                 "stock", "image_path", "is_available")
+
+    COLUMNS = "id, name, category, subcategory, price, stock, image_path, is_available"
+
+    def __init__(self, id, name, category, subcategory, price, stock, image_path, is_available=1):
+        self.id = id
+        self.name = name
+        self.category = category
+        self.subcategory = subcategory
+        self.price = price
+        self.stock = stock
+        self.image_path = image_path
+        self.is_available = is_available
+
+    def __repr__(self):
+        return f"Product({self.id}, {self.name!r}, stock={self.stock})"
+
+
+class Addon:
+    """One row of the addons table"""
+    __slots__ = ("id", "name", "category", "price", "stock", "is_available")
+
+    COLUMNS = "id, name, category, price, stock, is_available"
+
+    def __init__(self, id, name, category, price, stock, is_available=1):
+        self.id = id
+        self.name = name
+        self.category = category
+        self.price = price
+        self.stock = stock
+        self.is_available = is_available
+
+    def __repr__(self):
+        return f"Addon({self.id}, {self.name!r}, stock={self.stock})"
+
+
+class MenuCatalog:
+    """In-memory copy of the menu and addons tables for the POS read path.
+
+    Loaded once at start-up; every write made by this app goes through one of
+    the mutators below, each of which bumps ``version`` so derived views
+    (category listings, widgets) know when to rebuild. ``layout_version``
+    only moves when products are added, removed, renamed or re-categorised,
+    for views keyed on those fields alone.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.layout_version = 0
+        self._products = {}
+        self._products_by_name = {}
+        self._sections = {}
+        self._addons = {}
+        self._addons_by_name = {}
+        self._listing_cache = {}
+        self._listing_version = -1
+
+    # ===== Loading =====
+
+    def load(self):
+        """(Re)load everything from the database"""
+        with db_connection() as conn:
+            products = conn.execute(f"SELECT {Product.COLUMNS} FROM menu").fetchall()
+            addons = conn.execute(f"SELECT {Addon.COLUMNS} FROM addons").fetchall()
+
+        self._products.clear()
+        self._products_by_name.clear()
+        self._sections.clear()
+        for row in products:
+            self._index_product(Product(*row))
+
+        self._addons.clear()
+        self._addons_by_name.clear()
+        for row in addons:
+            addon = Addon(*row)
+            self._addons[addon.id] = addon
+            self._addons_by_name[addon.name] = addon
+        self.version += 1
+        self.layout_version += 1
+
+    def refresh_product(self, product_id):
+        """Re-read a single product after it was inserted or edited"""
+        with db_connection() as conn:
+            row = conn.execute(
+                f"SELECT {Product.COLUMNS} FROM menu WHERE id = ?", (product_id,)
+            ).fetchone()
+        self._unindex_product(product_id)
+        if row:
+            self._index_product(Product(*row))
+        self.version += 1
+        self.layout_version += 1
+
+    # ===== Mutators =====
+
+    def remove_product(self, product_id):
+        self._unindex_product(product_id)
+        self.version += 1
+        self.layout_version += 1
+
+    def set_product_stock(self, product_id, stock):
+        product = self._products.get(product_id)
+        if product is not None:
+            product.stock = stock
+            self.version += 1
+
+    def apply_sale(self, products, addons):
+        """Deduct quantities already committed by checkout.reserve_stock"""
+        for name, quantity in products.items():
+            product = self._products_by_name.get(name)
+            if product is not None:
+                product.stock -= quantity
+        for name, quantity in addons.items():
+            addon = self._addons_by_name.get(name)
+            if addon is not None:
+                addon.stock -= quantity
+        self.version += 1
+
+    # ===== Lookups =====
+
+    def product(self, name):
+        return self._products_by_name.get(name)
+
+    def product_by_id(self, product_id):
+        return self._products.get(product_id)
+
+    def all_products(self):
+        return list(self._products.values())
+
+    def products_in_section(self, category, subcategory):
+        return [self._products[pid] for pid in self._sections.get((category, subcategory), ())]
+
+    def products_in_category(self, category):
+        """In-stock products of a category ordered by subcategory, name"""
+        if self._listing_version != self.version:
+            self._listing_cache.clear()
+            self._listing_version = self.version
+        listing = self._listing_cache.get(category)
+        if listing is None:
+            listing = sorted(
+                (p for (cat, _sub), ids in self._sections.items() if cat == category
+                 for p in map(self._products.__getitem__, ids) if p.stock > 0),
+                key=lambda p: (p.subcategory, p.name)
+            )
+            self._listing_cache[category] = listing
+        return listing
+
+    def addon(self, name):
+        return self._addons_by_name.get(name)
+
+    def all_addons(self):
+        return list(self._addons.values())
+
+    def addons_for_category(self, category):
+        """In-stock add-ons offered for a category"""
+        return [a for a in self._addons.values() if a.category == category and a.stock > 0]
+
+    # ===== Index maintenance =====
+
+    def _index_product(self, product):
+        self._products[product.id] = product
+        self._products_by_name[product.name] = product
+        self._sections.setdefault((product.category, product.subcategory), []).append(product.id)
+
+    def _unindex_product(self, product_id):
+        product = self._products.pop(product_id, None)
+        if product is None:
+            return
+        if self._products_by_name.get(product.name) is product:
+            del self._products_by_name[product.name]
+        section = self._sections.get((product.category, product.subcategory))
+        if section:
+            section.remove(product_id)
+            if not section:
+                del self._sections[(product.category, product.subcategory)]
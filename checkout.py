@@ -0,0 +1,86 @@
+from collections import Counter
+
+from database import db_connection
+
+
+class StockShortageError(Exception):
+    """Raised when a cart needs more stock than is left; nothing is deducted"""
+
+    def __init__(self, shortages):
+        self.shortages = shortages
+        lines = [
+            f"• {name}: need {needed}, {available} left"
+            for _kind, name, needed, available in shortages
+        ]
+        super().__init__("Not enough stock for this order:\n" + "\n".join(lines))
+
+
+def aggregate_cart(cart_items):
+    """Count how many units of each product and add-on a cart needs"""
+    products = Counter()
+    addons = Counter()
+    for item in cart_items:
+        products[item['product_name']] += 1
+        for addon in item['addons']:
+            addons[addon] += 1
+    return products, addons
+
+
+def _needed_cte(needed):
+    placeholders = ", ".join(["(?, ?)"] * len(needed))
+    params = [value for pair in needed.items() for value in pair]
+    return f"WITH needed(name, quantity) AS (VALUES {placeholders})", params
+
+
+def _find_shortages(conn, table, kind, needed):
+    if not needed:
+        return []
+    cte, params = _needed_cte(needed)
+    rows = conn.execute(
+        f"{cte} "
+        f"SELECT needed.name, needed.quantity, COALESCE(t.stock, 0) "
+        f"FROM needed LEFT JOIN {table} t ON t.name = needed.name "
+        f"WHERE t.stock IS NULL OR t.stock < needed.quantity",
+        params
+    ).fetchall()
+    return [(kind, name, quantity, available) for name, quantity, available in rows]
+
+
+def _decrement(conn, table, needed):
+    if not needed:
+        return 0
+    cte, params = _needed_cte(needed)
+    quantity = f"(SELECT quantity FROM needed WHERE needed.name = {table}.name)"
+    # cursor.rowcount is not reported for statements that start with WITH
+    before = conn.total_changes
+    conn.execute(
+        f"{cte} "
+        f"UPDATE {table} SET stock = stock - {quantity} "
+        f"WHERE name IN (SELECT name FROM needed) AND stock >= {quantity}",
+        params
+    )
+    return conn.total_changes - before
+
+
+def reserve_stock(cart_items):
+    """Check and deduct stock for a whole cart in one write transaction.
+
+    Quantities are aggregated per product/add-on, checked with one query per
+    table and deducted with one conditional UPDATE per table while holding
+    the write lock, so two tills can never both sell the last unit.
+    Raises StockShortageError (after rolling back) if anything is short.
+    """
+    products, addons = aggregate_cart(cart_items)
+    with db_connection(immediate=True) as conn:
+        shortages = (_find_shortages(conn, "menu", "product", products)
+                     + _find_shortages(conn, "addons", "addon", addons))
+        if shortages:
+            raise StockShortageError(shortages)
+
+        if (_decrement(conn, "menu", products) < len(products)
+                or _decrement(conn, "addons", addons) < len(addons)):
+            # Cannot happen while the write lock is held; guard anyway
+            raise StockShortageError(
+                _find_shortages(conn, "menu", "product", products)
+                + _find_shortages(conn, "addons", "addon", addons))
+    return products, addons
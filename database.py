@@ -1,10 +1,86 @@
+import argparse
 import sqlite3
 import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
 from PIL import Image, ImageDraw
 
 DB_FILE = "cafe_shop.db"
 IMAGES_DIR = "product_images"
 
+# Applied to every pooled connection when it is opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+STATEMENT_CACHE_SIZE = 256
+
+DEFAULT_MENU = [
+    ("Espresso", "Coffee", "Hot Coffee", 60, 100, "espresso.jpg"),
+    ("Americano", "Coffee", "Hot Coffee", 70, 100, "americano.jpg"),
+    ("Latte", "Coffee", "Hot Coffee", 80, 100, "latte.jpg"),
+    ("Cappuccino", "Coffee", "Hot Coffee", 80, 100, "cappuccino.jpg"),
+    ("Mocha", "Coffee", "Hot Coffee", 90, 100, "mocha.jpg"),
+    ("Flat White", "Coffee", "Hot Coffee", 85, 100, "flat_white.jpg"),
+    ("Iced Americano", "Coffee", "Cold Coffee", 75, 100, "iced_americano.jpg"),
+    ("Iced Latte", "Coffee", "Cold Coffee", 85, 100, "iced_latte.jpg"),
+    ("Iced Mocha", "Coffee", "Cold Coffee", 95, 100, "iced_mocha.jpg"),
+    ("Cold Brew", "Coffee", "Cold Coffee", 80, 100, "cold_brew.jpg"),
+    ("Frappuccino", "Coffee", "Cold Coffee", 120, 100, "frappuccino.jpg"),
+
+    ("Chocolate Muffin", "Sweet Treats", "Pastry", 40, 30, "chocolate_muffin.jpg"),
+    ("Blueberry Muffin", "Sweet Treats", "Pastry", 45, 30, "blueberry_muffin.jpg"),
+    ("Croissant", "Sweet Treats", "Pastry", 35, 30, "croissant.jpg"),
+    ("Chocolate Chip Cookie", "Sweet Treats", "Pastry", 25, 30, "cookie.jpg"),
+    ("Brownie", "Sweet Treats", "Pastry", 50, 30, "brownie.jpg"),
+
+    ("Black Tea", "Tea", "Hot Tea", 50, 100, "black_tea.jpg"),
+    ("Green Tea", "Tea", "Hot Tea", 50, 100, "green_tea.jpg"),
+    ("Earl Grey", "Tea", "Hot Tea", 55, 100, "earl_grey.jpg"),
+    ("Chamomile", "Tea", "Hot Tea", 55, 100, "chamomile.jpg"),
+    ("English Breakfast", "Tea", "Hot Tea", 60, 100, "english_breakfast.jpg"),
+    ("Iced Tea", "Tea", "Cold Tea", 55, 100, "iced_tea.jpg"),
+    ("Iced Green Tea", "Tea", "Cold Tea", 55, 100, "iced_green_tea.jpg"),
+    ("Iced Lemon Tea", "Tea", "Cold Tea", 60, 100, "iced_lemon_tea.jpg"),
+    ("Peach Iced Tea", "Tea", "Cold Tea", 65, 100, "peach_iced_tea.jpg"),
+
+    ("Hot Chocolate", "Hot Beverages", "Hot Drinks", 65, 100, "hot_chocolate.jpg"),
+    ("Matcha Latte", "Hot Beverages", "Hot Drinks", 95, 100, "matcha_latte.jpg"),
+    ("Turmeric Latte", "Hot Beverages", "Hot Drinks", 85, 100, "turmeric_latte.jpg"),
+
+    ("Bubble Tea", "Cold Beverages", "Cold Drinks", 120, 100, "bubble_tea.jpg"),
+    ("Coke Float", "Cold Beverages", "Cold Drinks", 75, 10, "coke_float.jpg"),
+
+    ("Ham Sandwich", "Food", "Sandwich", 60, 50, "ham_sandwich.jpg"),
+    ("Chicken Sandwich", "Food", "Sandwich", 65, 50, "chicken_sandwich.jpg"),
+    ("Veggie Sandwich", "Food", "Sandwich", 55, 50, "veggie_sandwich.jpg"),
+    ("Club Sandwich", "Food", "Sandwich", 80, 50, "club_sandwich.jpg"),
+    ("Grilled Cheese", "Food", "Sandwich", 50, 50, "grilled_cheese.jpg"),
+]
+
+DEFAULT_ADDONS = [
+    ("Extra Shot", "Coffee", 15, 100),
+    ("Whipped Cream", "Coffee", 10, 100),
+    ("Caramel Syrup", "Coffee", 15, 100),
+    ("Chocolate Syrup", "Coffee", 15, 100),
+    ("Vanilla Syrup", "Coffee", 15, 100),
+    ("Hazelnut Syrup", "Coffee", 15, 100),
+    ("Honey", "Tea", 5, 100),
+    ("Lemon", "Tea", 5, 100),
+    ("Mint", "Tea", 5, 100),
+    ("Ginger", "Tea", 5, 100),
+    ("Extra Cheese", "Food", 10, 100),
+    ("Bacon", "Food", 15, 100),
+    ("Avocado", "Food", 20, 100),
+    ("Extra Scoop", "Cold Beverages", 15, 50),
+    ("Tapioca Pearls", "Cold Beverages", 10, 100),
+]
+
 
 def create_default_image():
     """Create a default product image"""
@@ -30,23 +106,10 @@ def create_default_image():
         print("Default image created!")
 
 
-def init_db():
-    """Initialize database with default data"""
-    if not os.path.exists(IMAGES_DIR):
-        os.makedirs(IMAGES_DIR)
-
-    create_default_image()
-
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
-    cursor.execute("DROP TABLE IF EXISTS sales_history")
-    cursor.execute("DROP TABLE IF EXISTS orders")
-    cursor.execute("DROP TABLE IF EXISTS addons")
-    cursor.execute("DROP TABLE IF EXISTS menu")
-
-    cursor.execute("""
-        CREATE TABLE orders (
+def _create_base_schema(conn):
+    """v1: the original tables, seeded with the default menu if empty"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS orders (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             customer_number VARCHAR(20),
             order_name VARCHAR(255),
@@ -61,8 +124,8 @@ def init_db():
         )
     """)
 
-    cursor.execute("""
-        CREATE TABLE menu (
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS menu (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name VARCHAR(255) UNIQUE,
             category VARCHAR(50),
@@ -74,8 +137,8 @@ def init_db():
         )
     """)
 
-    cursor.execute("""
-        CREATE TABLE addons (
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS addons (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name VARCHAR(255),
             category VARCHAR(50),
@@ -85,8 +148,8 @@ def init_db():
         )
     """)
 
-    cursor.execute("""
-        CREATE TABLE sales_history (
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sales_history (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             order_id INTEGER,
             customer_number VARCHAR(20),
@@ -102,88 +165,503 @@ def init_db():
         )
     """)
 
-    default_menu = [
-        ("Espresso", "Coffee", "Hot Coffee", 60, 100, "espresso.jpg"),
-        ("Americano", "Coffee", "Hot Coffee", 70, 100, "americano.jpg"),
-        ("Latte", "Coffee", "Hot Coffee", 80, 100, "latte.jpg"),
-        ("Cappuccino", "Coffee", "Hot Coffee", 80, 100, "cappuccino.jpg"),
-        ("Mocha", "Coffee", "Hot Coffee", 90, 100, "mocha.jpg"),
-        ("Flat White", "Coffee", "Hot Coffee", 85, 100, "flat_white.jpg"),
-        ("Iced Americano", "Coffee", "Cold Coffee", 75, 100, "iced_americano.jpg"),
-        ("Iced Latte", "Coffee", "Cold Coffee", 85, 100, "iced_latte.jpg"),
-        ("Iced Mocha", "Coffee", "Cold Coffee", 95, 100, "iced_mocha.jpg"),
-        ("Cold Brew", "Coffee", "Cold Coffee", 80, 100, "cold_brew.jpg"),
-        ("Frappuccino", "Coffee", "Cold Coffee", 120, 100, "frappuccino.jpg"),
-
-        ("Chocolate Muffin", "Sweet Treats", "Pastry", 40, 30, "chocolate_muffin.jpg"),
-        ("Blueberry Muffin", "Sweet Treats", "Pastry", 45, 30, "blueberry_muffin.jpg"),
-        ("Croissant", "Sweet Treats", "Pastry", 35, 30, "croissant.jpg"),
-        ("Chocolate Chip Cookie", "Sweet Treats", "Pastry", 25, 30, "cookie.jpg"),
-        ("Brownie", "Sweet Treats", "Pastry", 50, 30, "brownie.jpg"),
-
-        ("Black Tea", "Tea", "Hot Tea", 50, 100, "black_tea.jpg"),
-        ("Green Tea", "Tea", "Hot Tea", 50, 100, "green_tea.jpg"),
-        ("Earl Grey", "Tea", "Hot Tea", 55, 100, "earl_grey.jpg"),
-        ("Chamomile", "Tea", "Hot Tea", 55, 100, "chamomile.jpg"),
-        ("English Breakfast", "Tea", "Hot Tea", 60, 100, "english_breakfast.jpg"),
-        ("Iced Tea", "Tea", "Cold Tea", 55, 100, "iced_tea.jpg"),
-        ("Iced Green Tea", "Tea", "Cold Tea", 55, 100, "iced_green_tea.jpg"),
-        ("Iced Lemon Tea", "Tea", "Cold Tea", 60, 100, "iced_lemon_tea.jpg"),
-        ("Peach Iced Tea", "Tea", "Cold Tea", 65, 100, "peach_iced_tea.jpg"),
-
-        ("Hot Chocolate", "Hot Beverages", "Hot Drinks", 65, 100, "hot_chocolate.jpg"),
-        ("Matcha Latte", "Hot Beverages", "Hot Drinks", 95, 100, "matcha_latte.jpg"),
-        ("Turmeric Latte", "Hot Beverages", "Hot Drinks", 85, 100, "turmeric_latte.jpg"),
-
-        ("Bubble Tea", "Cold Beverages", "Cold Drinks", 120, 100, "bubble_tea.jpg"),
-        ("Coke Float", "Cold Beverages", "Cold Drinks", 75, 10, "coke_float.jpg"),
-
-        ("Ham Sandwich", "Food", "Sandwich", 60, 50, "ham_sandwich.jpg"),
-        ("Chicken Sandwich", "Food", "Sandwich", 65, 50, "chicken_sandwich.jpg"),
-        ("Veggie Sandwich", "Food", "Sandwich", 55, 50, "veggie_sandwich.jpg"),
-        ("Club Sandwich", "Food", "Sandwich", 80, 50, "club_sandwich.jpg"),
-        ("Grilled Cheese", "Food", "Sandwich", 50, 50, "grilled_cheese.jpg"),
-    ]
-
-    for name, category, subcategory, price, stock, image in default_menu:
-        image_path = os.path.join(IMAGES_DIR, image)
-        if not os.path.exists(image_path):
-            image_path = os.path.join(IMAGES_DIR, "default.jpg")
-        cursor.execute(
+    if conn.execute("SELECT COUNT(*) FROM menu").fetchone()[0] == 0:
+        conn.executemany(
             "INSERT INTO menu (name, category, subcategory, price, stock, image_path) "
             "VALUES (?, ?, ?, ?, ?, ?)",
-            (name, category, subcategory, price, stock, image_path)
+            [
+                (name, category, subcategory, price, stock, _seed_image_path(image))
+                for name, category, subcategory, price, stock, image in DEFAULT_MENU
+            ]
         )
 
-    default_addons = [
-        ("Extra Shot", "Coffee", 15, 100),
-        ("Whipped Cream", "Coffee", 10, 100),
-        ("Caramel Syrup", "Coffee", 15, 100),
-        ("Chocolate Syrup", "Coffee", 15, 100),
-        ("Vanilla Syrup", "Coffee", 15, 100),
-        ("Hazelnut Syrup", "Coffee", 15, 100),
-        ("Honey", "Tea", 5, 100),
-        ("Lemon", "Tea", 5, 100),
-        ("Mint", "Tea", 5, 100),
-        ("Ginger", "Tea", 5, 100),
-        ("Extra Cheese", "Food", 10, 100),
-        ("Bacon", "Food", 15, 100),
-        ("Avocado", "Food", 20, 100),
-        ("Extra Scoop", "Cold Beverages", 15, 50),
-        ("Tapioca Pearls", "Cold Beverages", 10, 100),
-    ]
-
-    for name, category, price, stock in default_addons:
-        cursor.execute(
+    if conn.execute("SELECT COUNT(*) FROM addons").fetchone()[0] == 0:
+        conn.executemany(
             "INSERT INTO addons (name, category, price, stock) VALUES (?, ?, ?, ?)",
-            (name, category, price, stock)
+            DEFAULT_ADDONS
+        )
+
+
+def _add_query_indexes(conn):
+    """v2: indexes shaped after the app's hot queries"""
+    statements = (
+        # POS grid: category = ? AND stock > 0 ORDER BY subcategory, name
+        "CREATE INDEX IF NOT EXISTS idx_menu_category_in_stock "
+        "ON menu (category, subcategory, name) WHERE stock > 0",
+        # Menu tab filters: category/subcategory, ORDER BY category, subcategory, name
+        "CREATE INDEX IF NOT EXISTS idx_menu_category_subcategory "
+        "ON menu (category, subcategory, name)",
+        # Add-on list: category = ? AND stock > 0 (covers name, price)
+        "CREATE INDEX IF NOT EXISTS idx_addons_category_stock "
+        "ON addons (category, stock, name, price)",
+        # Add-on lookups and checkout joins by name
+        "CREATE INDEX IF NOT EXISTS idx_addons_name ON addons (name, stock, price)",
+        # Sales report: status = 'Served', SUM(total), GROUP BY order_name
+        "CREATE INDEX IF NOT EXISTS idx_orders_status_name "
+        "ON orders (status, order_name, total)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_order_time ON orders (order_time)",
+        "CREATE INDEX IF NOT EXISTS idx_sales_history_order ON sales_history (order_id)",
+        "CREATE INDEX IF NOT EXISTS idx_sales_history_product "
+        "ON sales_history (product_name, quantity, total_price)",
+        "CREATE INDEX IF NOT EXISTS idx_sales_history_sale_time ON sales_history (sale_time)",
+    )
+    for statement in statements:
+        conn.execute(statement)
+
+
+def _add_line_item_detail(conn):
+    """v3: per-line size/temperature on sales_history and a best-seller index"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(sales_history)")}
+    if "size" not in columns:
+        conn.execute("ALTER TABLE sales_history ADD COLUMN size VARCHAR(20)")
+    if "temperature" not in columns:
+        conn.execute("ALTER TABLE sales_history ADD COLUMN temperature VARCHAR(20)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sales_history_products_sold "
+        "ON sales_history (product_name, quantity) WHERE addon_name IS NULL"
+    )
+    _backfill_line_items(conn)
+
+
+def _backfill_line_items(conn):
+    """One sales_history row per product for orders saved without line items.
+
+    Older versions only wrote the orders row, so best sellers would leave
+    those orders out. Products are split back out of order_name and priced
+    from the current menu; only the first item's size and temperature were
+    kept, and add-ons cannot be matched to their items, so they are skipped.
+    """
+    orders = conn.execute("""
+        SELECT id, customer_number, order_name, size, temperature,
+               service_type, packaging_type, order_time
+        FROM orders o
+        WHERE COALESCE(order_name, '') <> ''
+          AND NOT EXISTS (SELECT 1 FROM sales_history s WHERE s.order_id = o.id)
+    """).fetchall()
+    prices = dict(conn.execute("SELECT name, price FROM menu"))
+    rows = []
+    for order_id, customer, order_name, size, temperature, service, packaging, order_time in orders:
+        for index, product_name in enumerate(order_name.split(", ")):
+            price = prices.get(product_name)
+            detail = (size, temperature) if index == 0 else (None, None)
+            rows.append((order_id, customer, product_name, None, 1, price, price,
+                         *detail, service, packaging, order_time))
+    conn.executemany("""
+        INSERT INTO sales_history (
+            order_id, customer_number, product_name, addon_name, quantity,
+            unit_price, total_price, size, temperature,
+            service_type, packaging_type, sale_time
         )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+
+
+def _add_queue_index(conn):
+    """v4: open-order lookups by status in queue (rowid) order"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status)")
+
+
+def _add_image_blobs(conn):
+    """v5: content-addressed image store with reference counts kept by triggers"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS image_blobs (
+            digest CHAR(64) PRIMARY KEY,
+            path VARCHAR(255) NOT NULL UNIQUE,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            created_at DATETIME
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_menu_image_insert AFTER INSERT ON menu
+        BEGIN
+            UPDATE image_blobs SET ref_count = ref_count + 1 WHERE path = NEW.image_path;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_menu_image_update AFTER UPDATE OF image_path ON menu
+        WHEN OLD.image_path IS NOT NEW.image_path
+        BEGIN
+            UPDATE image_blobs SET ref_count = ref_count - 1 WHERE path = OLD.image_path;
+            UPDATE image_blobs SET ref_count = ref_count + 1 WHERE path = NEW.image_path;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_menu_image_delete AFTER DELETE ON menu
+        BEGIN
+            UPDATE image_blobs SET ref_count = ref_count - 1 WHERE path = OLD.image_path;
+        END
+    """)
+
+
+def fts5_available(conn):
+    """Whether this SQLite build has FTS5 with the trigram tokenizer (3.34+)"""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x, tokenize='trigram')")
+    except sqlite3.OperationalError:
+        return False
+    conn.execute("DROP TABLE temp.fts5_probe")
+    return True
+
+
+def _add_menu_fts(conn):
+    """v6: trigram FTS5 mirror of menu name/category/subcategory, where supported.
+
+    menu_fts is an external-content table over menu, so it stores only the
+    index; triggers keep it in step. Builds without FTS5 skip this and
+    search falls back to LIKE.
+    """
+    if not fts5_available(conn):
+        return
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS menu_fts USING fts5(
+            name, category, subcategory,
+            content='menu', content_rowid='id', tokenize='trigram'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_menu_fts_insert AFTER INSERT ON menu
+        BEGIN
+            INSERT INTO menu_fts (rowid, name, category, subcategory)
+            VALUES (NEW.id, NEW.name, NEW.category, NEW.subcategory);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_menu_fts_update AFTER UPDATE OF name, category, subcategory ON menu
+        BEGIN
+            INSERT INTO menu_fts (menu_fts, rowid, name, category, subcategory)
+            VALUES ('delete', OLD.id, OLD.name, OLD.category, OLD.subcategory);
+            INSERT INTO menu_fts (rowid, name, category, subcategory)
+            VALUES (NEW.id, NEW.name, NEW.category, NEW.subcategory);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_menu_fts_delete AFTER DELETE ON menu
+        BEGIN
+            INSERT INTO menu_fts (menu_fts, rowid, name, category, subcategory)
+            VALUES ('delete', OLD.id, OLD.name, OLD.category, OLD.subcategory);
+        END
+    """)
+    conn.execute("INSERT INTO menu_fts (menu_fts) VALUES ('rebuild')")
+
+
+# (table, bucket expression over an orders row) for the order-level rollups
+_ORDER_ROLLUPS = (
+    ("sales_hourly", "hour", "strftime('%Y-%m-%d %H:00', {row}.order_time)"),
+    ("sales_daily", "day", "date({row}.order_time)"),
+)
+
+
+def _order_rollup_upserts(row, sign):
+    """Add (sign=+1) or remove (-1) one served order in every order-level rollup"""
+    return "\n".join(
+        f"INSERT INTO {table} ({key}, order_count, revenue) "
+        f"VALUES (COALESCE({bucket.format(row=row)}, 'unknown'), {sign}, {sign} * COALESCE({row}.total, 0)) "
+        f"ON CONFLICT({key}) DO UPDATE SET order_count = order_count + excluded.order_count, "
+        f"revenue = revenue + excluded.revenue;"
+        for table, key, bucket in _ORDER_ROLLUPS
+    )
+
+
+def _product_rollup_upsert(order_id, sign):
+    """Add (sign=+1) or remove (-1) one order's product lines in product_sales_daily"""
+    return (
+        f"INSERT INTO product_sales_daily (day, product_name, quantity, revenue) "
+        f"SELECT COALESCE(date(sale_time), 'unknown'), product_name, "
+        f"{sign} * COALESCE(SUM(quantity), 0), {sign} * COALESCE(SUM(total_price), 0) "
+        f"FROM sales_history WHERE order_id = {order_id} "
+        f"AND addon_name IS NULL AND product_name IS NOT NULL "
+        f"GROUP BY 1, 2 "
+        f"ON CONFLICT(day, product_name) DO UPDATE SET "
+        f"quantity = quantity + excluded.quantity, revenue = revenue + excluded.revenue;"
+    )
 
-    conn.commit()
-    conn.close()
-    print("Database initialized successfully!")
+
+def _add_sales_rollups(conn):
+    """v7: hourly/daily served-order totals and daily units per product.
+
+    Triggers update the rollups inside whatever transaction writes the order
+    or its line items, so the report never reads a half-applied sale.
+    Only served orders count, in the order totals and the product rows
+    alike: line items are written at checkout, so an order's products are
+    added when it is served (and removed if it is un-served).
+    """
+    for table, key, _bucket in _ORDER_ROLLUPS:
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {key} TEXT PRIMARY KEY,
+                order_count INTEGER NOT NULL DEFAULT 0,
+                revenue DECIMAL(10,2) NOT NULL DEFAULT 0
+            )
+        """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS product_sales_daily (
+            day TEXT NOT NULL,
+            product_name VARCHAR(255) NOT NULL,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            revenue DECIMAL(10,2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, product_name)
+        ) WITHOUT ROWID
+    """)
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_orders_rollup_insert AFTER INSERT ON orders
+        WHEN NEW.status = 'Served'
+        BEGIN
+            {_order_rollup_upserts("NEW", 1)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_orders_rollup_served AFTER UPDATE OF status ON orders
+        WHEN NEW.status = 'Served' AND OLD.status IS NOT 'Served'
+        BEGIN
+            {_order_rollup_upserts("NEW", 1)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_orders_rollup_unserved AFTER UPDATE OF status ON orders
+        WHEN OLD.status = 'Served' AND NEW.status IS NOT 'Served'
+        BEGIN
+            {_order_rollup_upserts("OLD", -1)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_orders_product_rollup_served
+        AFTER UPDATE OF status ON orders
+        WHEN NEW.status = 'Served' AND OLD.status IS NOT 'Served'
+        BEGIN
+            {_product_rollup_upsert("NEW.id", 1)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_orders_product_rollup_unserved
+        AFTER UPDATE OF status ON orders
+        WHEN OLD.status = 'Served' AND NEW.status IS NOT 'Served'
+        BEGIN
+            {_product_rollup_upsert("OLD.id", -1)}
+        END
+    """)
+    # Lines written for an order that is already served (e.g. imported history)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_sales_history_served_rollup AFTER INSERT ON sales_history
+        WHEN NEW.addon_name IS NULL AND NEW.product_name IS NOT NULL
+             AND (SELECT status FROM orders WHERE id = NEW.order_id) = 'Served'
+        BEGIN
+            INSERT INTO product_sales_daily (day, product_name, quantity, revenue)
+            VALUES (COALESCE(date(NEW.sale_time), 'unknown'), NEW.product_name,
+                    COALESCE(NEW.quantity, 0), COALESCE(NEW.total_price, 0))
+            ON CONFLICT(day, product_name) DO UPDATE SET
+                quantity = quantity + excluded.quantity,
+                revenue = revenue + excluded.revenue;
+        END
+    """)
+    rebuild_sales_rollups(conn)
+
+
+def _add_stock_indexes(conn):
+    """v8: low-stock lookups (stock < threshold ORDER BY stock) for the inventory window"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_menu_stock ON menu (stock)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_addons_stock ON addons (stock)")
+
+
+def rebuild_sales_rollups(conn):
+    """Recompute every rollup table from orders and sales_history"""
+    for table, key, bucket in _ORDER_ROLLUPS:
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(f"""
+            INSERT INTO {table} ({key}, order_count, revenue)
+            SELECT COALESCE({bucket.format(row="orders")}, 'unknown'), COUNT(*), COALESCE(SUM(total), 0)
+            FROM orders WHERE status = 'Served'
+            GROUP BY 1
+        """)
+    conn.execute("DELETE FROM product_sales_daily")
+    conn.execute("""
+        INSERT INTO product_sales_daily (day, product_name, quantity, revenue)
+        SELECT COALESCE(date(s.sale_time), 'unknown'), s.product_name,
+               COALESCE(SUM(s.quantity), 0), COALESCE(SUM(s.total_price), 0)
+        FROM sales_history s JOIN orders o ON o.id = s.order_id
+        WHERE s.addon_name IS NULL AND s.product_name IS NOT NULL AND o.status = 'Served'
+        GROUP BY 1, 2
+    """)
+
+
+def _seed_image_path(image):
+    image_path = os.path.join(IMAGES_DIR, image)
+    if not os.path.exists(image_path):
+        image_path = os.path.join(IMAGES_DIR, "default.jpg")
+    return image_path
+
+
+# Schema migrations, applied in order. PRAGMA user_version records the last
+# one applied, so each runs exactly once per database file. Append only.
+MIGRATIONS = [
+    _create_base_schema,
+    _add_query_indexes,
+    _add_line_item_detail,
+    _add_queue_index,
+    _add_image_blobs,
+    _add_menu_fts,
+    _add_sales_rollups,
+    _add_stock_indexes,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply any pending migrations; returns the number applied"""
+    version = schema_version(conn)
+    for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        migration(conn)
+        # PRAGMA does not accept bound parameters
+        conn.execute(f"PRAGMA user_version = {target:d}")
+    return max(SCHEMA_VERSION - version, 0)
+
+
+def init_db():
+    """Bring the database up to the current schema without touching existing data"""
+    if not os.path.exists(IMAGES_DIR):
+        os.makedirs(IMAGES_DIR)
+
+    create_default_image()
+
+    if schema_version(connection_manager.get()) >= SCHEMA_VERSION:
+        return
+
+    with db_connection(immediate=True) as conn:
+        # Re-check under the write lock in case another till migrated first
+        applied = migrate(conn)
+    if applied:
+        print(f"Database migrated to schema v{SCHEMA_VERSION}")
+
+
+class ConnectionManager:
+    """Keep one warm SQLite connection per thread instead of reconnecting per query.
+
+    With read_only=True connections are opened with mode=ro and query_only,
+    for threads that must never take the write lock.
+    """
+
+    def __init__(self, db_file=DB_FILE, statement_cache_size=STATEMENT_CACHE_SIZE, read_only=False):
+        self.db_file = db_file
+        self.statement_cache_size = statement_cache_size
+        self.read_only = read_only
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def _connect(self):
+        # isolation_level=None: transactions are opened explicitly by connection()
+        if self.read_only:
+            conn = sqlite3.connect(
+                f"{Path(os.path.abspath(self.db_file)).as_uri()}?mode=ro",
+                uri=True,
+                isolation_level=None,
+                cached_statements=self.statement_cache_size,
+            )
+            # WAL is recorded in the file; a read-only handle cannot set it
+            pragmas = [p for p in CONNECTION_PRAGMAS if "journal_mode" not in p]
+            pragmas.append("PRAGMA query_only = ON")
+        else:
+            conn = sqlite3.connect(
+                self.db_file,
+                isolation_level=None,
+                cached_statements=self.statement_cache_size,
+            )
+            pragmas = CONNECTION_PRAGMAS
+        for pragma in pragmas:
+            conn.execute(pragma)
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def get(self):
+        """Return this thread's pooled connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def connection(self, immediate=False):
+        """Run a block inside a transaction on the pooled connection.
+
+        Commits on success and rolls back on error. Nested blocks join the
+        outermost transaction. ``immediate=True`` takes the write lock up front.
+        """
+        conn = self.get()
+        outermost = self._local.depth == 0
+        if outermost:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        self._local.depth += 1
+        try:
+            yield conn
+        except BaseException:
+            self._local.depth -= 1
+            if outermost and conn.in_transaction:
+                conn.rollback()
+            raise
+        else:
+            self._local.depth -= 1
+            if outermost and conn.in_transaction:
+                try:
+                    conn.commit()
+                except BaseException:
+                    # e.g. SQLITE_BUSY: don't leave the transaction open for the next BEGIN
+                    if conn.in_transaction:
+                        conn.rollback()
+                    raise
+
+    def close(self):
+        """Close the calling thread's connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+            conn.close()
+
+    def close_all(self):
+        """Close every pooled connection (call on shutdown)"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Owned by another thread; it is released when that thread exits
+                pass
+        self._local = threading.local()
+
+
+connection_manager = ConnectionManager()
+
+
+def db_connection(immediate=False):
+    """Context manager yielding the pooled connection for the current thread"""
+    return connection_manager.connection(immediate=immediate)
 
 
 def get_db_connection():
-    """Get database connection"""
+    """Get a standalone database connection (prefer db_connection())"""
     return sqlite3.connect(DB_FILE)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Database maintenance")
+    parser.add_argument("--rebuild-rollups", action="store_true",
+                        help="recompute the sales rollup tables from order history")
+    args = parser.parse_args()
+    if args.rebuild_rollups:
+        init_db()
+        with db_connection(immediate=True) as conn:
+            rebuild_sales_rollups(conn)
+            days = conn.execute("SELECT COUNT(*) FROM sales_daily").fetchone()[0]
+        print(f"Sales rollups rebuilt ({days} days)")
+    else:
+        parser.print_help()
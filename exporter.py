@@ -0,0 +1,197 @@
+import argparse
+import csv
+import gzip
+import json
+import os
+from datetime import date, timedelta
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+CHUNK_SIZE = 5000
+
+# table -> (time column used by the date-range filter, or None)
+EXPORT_TABLES = {
+    "menu": None,
+    "addons": None,
+    "orders": "order_time",
+    "sales_history": "sale_time",
+}
+
+
+def columnar_format():
+    """'parquet' when pyarrow is installed, else gzipped JSON lines"""
+    return "parquet" if pa is not None else "jsonl.gz"
+
+
+def iter_chunks(cursor, size=CHUNK_SIZE):
+    """Yield lists of at most ``size`` rows until the cursor is exhausted"""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield rows
+
+
+def table_columns(conn, table):
+    """[(name, declared type)] in table order"""
+    return [(row[1], (row[2] or "").upper()) for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def select_rows(conn, table, start=None, end=None):
+    """Cursor over a table, limited to [start, end] by its time column.
+
+    The time-filtered tables are read in time order through their time
+    index (idx_orders_order_time / idx_sales_history_sale_time), so a date
+    range only touches the rows inside it.
+    """
+    columns = ", ".join(name for name, _type in table_columns(conn, table))
+    time_column = EXPORT_TABLES[table]
+    if time_column is None or (start is None and end is None):
+        return conn.execute(f"SELECT {columns} FROM {table} ORDER BY id")
+
+    where, params = [], []
+    if start is not None:
+        where.append(f"{time_column} >= ?")
+        params.append(start.isoformat())
+    if end is not None:
+        # Stored values carry a time of day, so compare against the next midnight
+        where.append(f"{time_column} < ?")
+        params.append((end + timedelta(days=1)).isoformat())
+    return conn.execute(
+        f"SELECT {columns} FROM {table} WHERE {' AND '.join(where)} ORDER BY {time_column}, id",
+        params
+    )
+
+
+def _arrow_type(declared):
+    if "INT" in declared or "BOOL" in declared:
+        return pa.int64()
+    if "DEC" in declared or "REAL" in declared or "FLOA" in declared or "DOUB" in declared:
+        return pa.float64()
+    return pa.string()
+
+
+def _write_csv(path, columns, chunks):
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([name for name, _type in columns])
+        for rows in chunks:
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def _write_jsonl_gz(path, columns, chunks):
+    names = [name for name, _type in columns]
+    count = 0
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for rows in chunks:
+            f.write("".join(json.dumps(dict(zip(names, row)), default=str) + "\n" for row in rows))
+            count += len(rows)
+    return count
+
+
+def _write_parquet(path, columns, chunks):
+    schema = pa.schema([(name, _arrow_type(declared)) for name, declared in columns])
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in chunks:
+            arrays = [
+                pa.array([_coerce(row[i], field.type) for row in rows], type=field.type)
+                for i, field in enumerate(schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            count += len(rows)
+    return count
+
+
+def _coerce(value, arrow_type):
+    """SQLite columns are loosely typed; make each value fit the column's Arrow type"""
+    if value is None:
+        return None
+    try:
+        if arrow_type == pa.int64():
+            return int(value)
+        if arrow_type == pa.float64():
+            return float(value)
+    except (TypeError, ValueError):
+        return None
+    return str(value)
+
+
+WRITERS = {
+    "csv": _write_csv,
+    "jsonl.gz": _write_jsonl_gz,
+    "parquet": _write_parquet,
+}
+
+
+def export_table(conn, table, path, fmt="csv", start=None, end=None, chunk_size=CHUNK_SIZE):
+    """Stream one table to ``path``; returns the number of rows written.
+
+    Rows go from the cursor to the file ``chunk_size`` at a time, so memory
+    stays flat however large the table or range is.
+    """
+    if fmt == "parquet" and pa is None:
+        raise RuntimeError("Parquet export needs pyarrow; use the jsonl.gz format instead")
+    cursor = select_rows(conn, table, start, end)
+    return WRITERS[fmt](path, table_columns(conn, table), iter_chunks(cursor, chunk_size))
+
+
+def export_tables(conn, directory, tables=tuple(EXPORT_TABLES), fmt="csv",
+                  start=None, end=None, chunk_size=CHUNK_SIZE):
+    """Export several tables from one read snapshot; returns {path: rows}.
+
+    If anything fails or the query is interrupted, every file this call
+    created is deleted, so the folder never holds a half-written export.
+    """
+    os.makedirs(directory, exist_ok=True)
+    written = {}
+    started = []
+    conn.execute("BEGIN")
+    try:
+        for table in tables:
+            path = os.path.join(directory, f"{table}.{fmt}")
+            started.append(path)
+            written[path] = export_table(conn, table, path, fmt, start, end, chunk_size)
+    except BaseException:
+        for path in started:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    finally:
+        if conn.in_transaction:
+            conn.execute("COMMIT")
+    return written
+
+
+def parse_date(text):
+    """YYYY-MM-DD, or None for a blank value"""
+    text = (text or "").strip()
+    return date.fromisoformat(text) if text else None
+
+
+if __name__ == "__main__":
+    from database import ConnectionManager, DB_FILE
+
+    parser = argparse.ArgumentParser(description="Export menu, add-ons and sales history")
+    parser.add_argument("--out", default="export")
+    parser.add_argument("--format", choices=("csv", "columnar"), default="csv",
+                        help="columnar = Parquet with pyarrow, otherwise gzipped JSON lines")
+    parser.add_argument("--since", type=parse_date, help="first day of orders/sales (YYYY-MM-DD)")
+    parser.add_argument("--until", type=parse_date, help="last day of orders/sales (YYYY-MM-DD)")
+    parser.add_argument("--tables", nargs="+", choices=tuple(EXPORT_TABLES), default=tuple(EXPORT_TABLES))
+    parser.add_argument("--db", default=DB_FILE)
+    args = parser.parse_args()
+
+    fmt = columnar_format() if args.format == "columnar" else "csv"
+    connections = ConnectionManager(args.db, read_only=True)
+    for path, rows in export_tables(connections.get(), args.out, args.tables, fmt,
+                                    args.since, args.until).items():
+        print(f"{rows:>9} rows  {path}")
+    connections.close_all()
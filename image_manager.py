@@ -1,14 +1,215 @@
+import argparse
+import glob
+import hashlib
+import io
 import os
-from tkinter import messagebox, filedialog
-from PIL import Image, ImageTk
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from tkinter import messagebox, filedialog, TclError
+from PIL import Image, ImageTk, features
+
+from database import db_connection
+
+PLACEHOLDER_COLOR = '#6f4e37'
+
+# Every size the UI renders: POS card, selection banner, menu-tab preview
+THUMBNAIL_SIZES = ((140, 100), (45, 45), (100, 100))
+THUMBNAILS_DIRNAME = "thumbnails"
+BLOBS_DIRNAME = "blobs"
+# Another till may be mid-edit with a fresh upload that is not on a product yet
+UNATTACHED_GRACE = timedelta(days=1)
+THUMBNAIL_FORMAT, THUMBNAIL_EXT = ("WEBP", "webp") if features.check("webp") else ("JPEG", "jpg")
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache that evicts by total byte size"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, nbytes):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+                _key, (_value, size) = self._entries.popitem(last=False)
+                self.current_bytes -= size
+
+    def discard(self, predicate):
+        """Drop every entry whose key matches predicate"""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                self.current_bytes -= self._entries.pop(key)[1]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def image_nbytes(img):
+    return img.width * img.height * len(img.getbands())
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def thumbnail_path(thumbnails_dir, digest, size):
+    """Content-addressed location of one pre-sized derivative"""
+    width, height = size
+    return os.path.join(thumbnails_dir, digest[:2], f"{digest}_{width}x{height}.{THUMBNAIL_EXT}")
+
+
+def build_thumbnails(image_path, thumbnails_dir, sizes=THUMBNAIL_SIZES):
+    """Write every missing derivative of an image; returns its digest.
+
+    Module-level so it can run in a process pool.
+    """
+    digest = file_digest(image_path)
+    targets = [(size, thumbnail_path(thumbnails_dir, digest, size)) for size in sizes]
+    targets = [(size, path) for size, path in targets if not os.path.exists(path)]
+    if targets:
+        with Image.open(image_path) as source:
+            img = source.convert('RGB')
+        for size, path in targets:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            img.resize(size, Image.Resampling.LANCZOS).save(tmp_path, THUMBNAIL_FORMAT, quality=85)
+            os.replace(tmp_path, path)
+    return digest
+
+
+class ImageStore:
+    """Content-addressed product images with reference counting.
+
+    Each stored image lives at blobs/<aa>/<sha256>.jpg and has a row in
+    image_blobs keyed by that digest. menu.image_path points at the blob path;
+    triggers on menu keep image_blobs.ref_count equal to the number of
+    products using it, so files are only deleted once nothing refers to them.
+    """
+
+    def __init__(self, images_dir):
+        self.images_dir = images_dir
+        self.blobs_dir = os.path.join(images_dir, BLOBS_DIRNAME)
+        self.thumbnails_dir = os.path.join(images_dir, THUMBNAILS_DIRNAME)
+
+    def blob_path(self, digest):
+        return os.path.join(self.blobs_dir, digest[:2], f"{digest}.jpg")
+
+    def put(self, img, quality=85):
+        """Store a PIL image; identical content is stored once. Returns (path, is_new)"""
+        buffer = io.BytesIO()
+        img.save(buffer, 'JPEG', quality=quality)
+        data = buffer.getvalue()
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+
+        with db_connection(immediate=True) as conn:
+            row = conn.execute(
+                "SELECT path FROM image_blobs WHERE digest = ?", (digest,)
+            ).fetchone()
+            if row and os.path.exists(row[0]):
+                return row[0], False
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            conn.execute(
+                "INSERT OR REPLACE INTO image_blobs (digest, path, ref_count, created_at) "
+                "VALUES (?, ?, (SELECT COUNT(*) FROM menu WHERE image_path = ?), ?)",
+                (digest, path, path, datetime.now())
+            )
+        build_thumbnails(path, self.thumbnails_dir)
+        return path, True
+
+    def is_managed(self, path):
+        if not path:
+            return False
+        with db_connection() as conn:
+            return conn.execute(
+                "SELECT 1 FROM image_blobs WHERE path = ?", (path,)
+            ).fetchone() is not None
+
+    def release(self, path):
+        """Delete a blob (and its derivatives) if no product uses it any more"""
+        with db_connection(immediate=True) as conn:
+            row = conn.execute(
+                "SELECT digest, ref_count FROM image_blobs WHERE path = ?", (path,)
+            ).fetchone()
+            if row is None or row[1] > 0:
+                return False
+            conn.execute("DELETE FROM image_blobs WHERE digest = ?", (row[0],))
+        self._remove_files(row[0], path)
+        return True
+
+    def prune(self, grace=UNATTACHED_GRACE):
+        """Delete blobs uploaded more than ``grace`` ago and never attached to a
+        product; returns the count"""
+        cutoff = datetime.now() - grace
+        with db_connection(immediate=True) as conn:
+            rows = conn.execute(
+                "SELECT digest, path FROM image_blobs WHERE ref_count <= 0 AND created_at < ?",
+                (cutoff,)
+            ).fetchall()
+            conn.executemany("DELETE FROM image_blobs WHERE digest = ? AND ref_count <= 0",
+                             [(digest,) for digest, _path in rows])
+        for digest, path in rows:
+            self._remove_files(digest, path)
+        return len(rows)
+
+    def _remove_files(self, digest, path):
+        derivatives = glob.glob(os.path.join(self.thumbnails_dir, digest[:2], f"{digest}_*"))
+        for file_path in [path, *derivatives]:
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Warning: Could not delete image file: {e}")
 
 
 class ImageManager:
     """Manage product images - upload, resize, delete"""
 
-    def __init__(self, images_dir="product_images"):
+    def __init__(self, images_dir="product_images",
+                 image_cache_bytes=32 * 1024 * 1024, photo_cache_bytes=16 * 1024 * 1024,
+                 loader_threads=4):
         self.images_dir = images_dir
         self.supported_formats = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')
+        # Two tiers keyed by (path, mtime, size): decoded+resized PIL images,
+        # and the Tk PhotoImages built from them
+        self.image_cache = LRUCache(image_cache_bytes)
+        self.photo_cache = LRUCache(photo_cache_bytes)
+        self.thumbnails_dir = os.path.join(images_dir, THUMBNAILS_DIRNAME)
+        self._digests = {}
+        self.loader_threads = loader_threads
+        self._executor = None
+        self._pending = {}
+        self._shut_down = False
+        self._placeholders = {}
+        self.store = ImageStore(images_dir)
         self.ensure_images_directory()
 
     def ensure_images_directory(self):
@@ -23,16 +224,6 @@ class ImageManager:
         except (IOError, SyntaxError):
             return False
 
-    def get_unique_filename(self, original_filename):
-        base_name = os.path.basename(original_filename)
-        name, ext = os.path.splitext(base_name)
-        counter = 1
-        new_filename = base_name
-        while os.path.exists(os.path.join(self.images_dir, new_filename)):
-            new_filename = f"{name}_{counter}{ext}"
-            counter += 1
-        return new_filename
-
     def resize_image(self, image_path, max_size=(300, 300)):
         try:
             with Image.open(image_path) as img:
@@ -64,40 +255,198 @@ class ImageManager:
 
         try:
             resized_img = self.resize_image(file_path)
-            original_filename = os.path.basename(file_path)
-            new_filename = self.get_unique_filename(original_filename)
-            new_filepath = os.path.join(self.images_dir, new_filename)
-
-            resized_img.save(new_filepath, 'JPEG', quality=85)
-            messagebox.showinfo("Success", f"Image uploaded successfully as {new_filename}")
+            new_filepath, is_new = self.store.put(resized_img)
+            if is_new:
+                messagebox.showinfo("Success", "Image uploaded successfully")
+            else:
+                messagebox.showinfo("Success", "Image already in the library; reusing it")
             return new_filepath
         except Exception as e:
             messagebox.showerror("Upload Error", f"Failed to upload image: {str(e)}")
             return None
 
+    def release_image(self, image_path):
+        """Delete a stored image once no product refers to it"""
+        try:
+            if self.store.is_managed(image_path) and self.store.release(image_path):
+                self.invalidate(image_path)
+                return True
+        except Exception as e:
+            print(f"Error releasing image: {e}")
+        return False
+
     def delete_image(self, image_path):
+        if self.store.is_managed(image_path):
+            return self.release_image(image_path)
         try:
+            # Images uploaded before the content-addressed store are unshared files
             if image_path and os.path.exists(image_path) and not image_path.endswith("default.jpg"):
                 os.remove(image_path)
+                self.invalidate(image_path)
                 return True
         except Exception as e:
             print(f"Error deleting image: {e}")
         return False
 
-    def get_image_preview(self, image_path, size=(100, 100)):
+    def invalidate(self, image_path):
+        """Forget cached renditions of an image"""
+        self.image_cache.discard(lambda key: key[0] == image_path)
+        self.photo_cache.discard(lambda key: key[0] == image_path)
+
+    def _preview_key(self, image_path, size):
+        if not image_path or not os.path.exists(image_path):
+            image_path = os.path.join(self.images_dir, "default.jpg")
         try:
-            if not image_path or not os.path.exists(image_path):
-                default_path = os.path.join(self.images_dir, "default.jpg")
-                if os.path.exists(default_path):
-                    img = Image.open(default_path)
+            mtime = os.stat(image_path).st_mtime_ns
+        except OSError:
+            image_path, mtime = None, 0
+        return (image_path, mtime, tuple(size))
+
+    def get_preview_image(self, image_path, size=(100, 100)):
+        """Decoded, resized PIL image for a preview (cached)"""
+        return self._cached_image(self._preview_key(image_path, size))
+
+    def _cached_image(self, key):
+        img = self.image_cache.get(key)
+        if img is None:
+            path, mtime, size = key
+            try:
+                if path is None:
+                    img = Image.new('RGB', size, color=PLACEHOLDER_COLOR)
                 else:
-                    img = Image.new('RGB', size, color='#6f4e37')
-            else:
-                img = Image.open(image_path)
+                    thumbnail = self._thumbnail_for(path, mtime, size)
+                    if thumbnail is not None:
+                        with Image.open(thumbnail) as source:
+                            source.load()
+                            img = source
+                    else:
+                        with Image.open(path) as source:
+                            img = source.resize(size, Image.Resampling.LANCZOS)
+            except Exception as e:
+                print(f"Error loading image preview: {e}")
+                img = Image.new('RGB', size, color=PLACEHOLDER_COLOR)
+            self.image_cache.put(key, img, image_nbytes(img))
+        return img
 
-            img = img.resize(size, Image.Resampling.LANCZOS)
-            return ImageTk.PhotoImage(img)
-        except Exception as e:
-            print(f"Error loading image preview: {e}")
-            img = Image.new('RGB', size, color='#6f4e37')
-            return ImageTk.PhotoImage(img)
+    def _thumbnail_for(self, path, mtime, size):
+        """Pre-generated derivative for this exact size, if one exists"""
+        if size not in THUMBNAIL_SIZES:
+            return None
+        digest = self._digests.get((path, mtime))
+        if digest is None:
+            digest = file_digest(path)
+            self._digests[(path, mtime)] = digest
+        thumbnail = thumbnail_path(self.thumbnails_dir, digest, size)
+        return thumbnail if os.path.exists(thumbnail) else None
+
+    def get_image_preview(self, image_path, size=(100, 100)):
+        key = self._preview_key(image_path, size)
+        photo = self.photo_cache.get(key)
+        if photo is None:
+            img = self._cached_image(key)
+            photo = ImageTk.PhotoImage(img)
+            self.photo_cache.put(key, photo, image_nbytes(img))
+        return photo
+
+    # ===== Background loading =====
+
+    def placeholder(self, size):
+        """Flat placeholder PhotoImage shown while the real preview loads"""
+        size = tuple(size)
+        photo = self._placeholders.get(size)
+        if photo is None:
+            photo = ImageTk.PhotoImage(Image.new('RGB', size, color=PLACEHOLDER_COLOR))
+            self._placeholders[size] = photo
+        return photo
+
+    def get_image_preview_async(self, root, image_path, size, on_ready):
+        """Deliver a preview PhotoImage to on_ready(photo) on the Tk thread.
+
+        Cached previews are delivered immediately. Otherwise the file is
+        decoded and resized on a worker thread and the PhotoImage is built
+        back on the Tk thread via root.after. Must be called from the Tk thread.
+        """
+        key = self._preview_key(image_path, size)
+        photo = self.photo_cache.get(key)
+        if photo is not None:
+            on_ready(photo)
+            return
+
+        waiting = self._pending.get(key)
+        if waiting is not None:
+            waiting.append(on_ready)
+            return
+        self._pending[key] = [on_ready]
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.loader_threads, thread_name_prefix="image-loader")
+        future = self._executor.submit(self._cached_image, key)
+        future.add_done_callback(lambda _f: self._schedule(root, key))
+
+    def _schedule(self, root, key):
+        try:
+            root.after(0, self._deliver, key)
+        except (RuntimeError, TclError):
+            # The window was closed before the image finished loading
+            pass
+
+    def _deliver(self, key):
+        callbacks = self._pending.pop(key, [])
+        if self._shut_down or not callbacks:
+            # Nobody is waiting any more; don't build a PhotoImage for nothing
+            return
+        photo = self.photo_cache.get(key)
+        if photo is None:
+            img = self._cached_image(key)
+            photo = ImageTk.PhotoImage(img)
+            self.photo_cache.put(key, photo, image_nbytes(img))
+        for on_ready in callbacks:
+            try:
+                on_ready(photo)
+            except TclError:
+                # Target widget was destroyed while loading
+                pass
+
+    def shutdown(self):
+        """Stop the loader threads, dropping queued work"""
+        self._shut_down = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._pending.clear()
+
+
+def rebuild_thumbnails(images_dir="product_images", processes=None):
+    """Generate missing derivatives for every image under images_dir in parallel"""
+    thumbnails_dir = os.path.join(images_dir, THUMBNAILS_DIRNAME)
+    extensions = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')
+    sources = []
+    for dirpath, dirnames, filenames in os.walk(images_dir):
+        dirnames[:] = [d for d in dirnames if os.path.join(dirpath, d) != thumbnails_dir]
+        sources.extend(os.path.join(dirpath, f) for f in filenames if f.lower().endswith(extensions))
+
+    built = 0
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = {pool.submit(build_thumbnails, path, thumbnails_dir): path for path in sources}
+        for future, path in futures.items():
+            try:
+                future.result()
+                built += 1
+            except Exception as e:
+                print(f"Skipping {path}: {e}")
+    return built
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Product image maintenance")
+    parser.add_argument("--rebuild-thumbnails", action="store_true",
+                        help="generate pre-sized derivatives for every stored image")
+    parser.add_argument("--images-dir", default="product_images")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+    if args.rebuild_thumbnails:
+        count = rebuild_thumbnails(args.images_dir, args.processes)
+        print(f"Thumbnails ready for {count} images")
+    else:
+        parser.print_help()
@@ -0,0 +1,250 @@
+import sqlite3
+import customtkinter as ctk
+from tkinter import filedialog, messagebox, ttk
+
+from exporter import EXPORT_TABLES, columnar_format, export_tables, parse_date
+from menu_tab import MenuTreeView
+
+PAGE_SIZE = 100
+LOW_STOCK_THRESHOLD = 10
+
+
+def stock_status(stock, threshold=LOW_STOCK_THRESHOLD):
+    if stock <= 0:
+        return "Sold Out"
+    if stock < threshold:
+        return "Low Stock"
+    return "In Stock"
+
+
+# ===== Keyset-paginated queries =====
+# Each returns up to ``limit`` (key, row id, values) tuples after ``after``,
+# the key of the last row already shown, so every page is an index range
+# scan no matter how deep into the list it is.
+
+def menu_page(conn, threshold, after=None, limit=PAGE_SIZE):
+    """Menu items by name (names are unique)"""
+    where, params = ("WHERE name > ?", [after[0]]) if after else ("", [])
+    rows = conn.execute(
+        f"SELECT id, name, category, subcategory, price, stock FROM menu {where} "
+        f"ORDER BY name LIMIT ?", [*params, limit]
+    ).fetchall()
+    return [((name,), ("menu", item_id),
+             (item_id, name, category, subcategory, f"₱{price}", stock,
+              stock_status(stock, threshold)))
+            for item_id, name, category, subcategory, price, stock in rows]
+
+
+def addon_page(conn, threshold, after=None, limit=PAGE_SIZE):
+    """Add-ons by name, then id (the same add-on name exists per category)"""
+    where, params = ("WHERE (name, id) > (?, ?)", list(after)) if after else ("", [])
+    rows = conn.execute(
+        f"SELECT id, name, category, price, stock FROM addons {where} "
+        f"ORDER BY name, id LIMIT ?", [*params, limit]
+    ).fetchall()
+    return [((name, item_id), ("addon", item_id),
+             (item_id, name, category, f"₱{price}", stock, stock_status(stock, threshold)))
+            for item_id, name, category, price, stock in rows]
+
+
+def low_stock_page(conn, threshold, after=None, limit=PAGE_SIZE):
+    """Menu items and add-ons with stock < threshold, lowest stock first"""
+    params = {"threshold": threshold, "limit": limit}
+    where = ""
+    if after:
+        where = "WHERE (stock, kind, id) > (:stock, :kind, :id)"
+        params.update(zip(("stock", "kind", "id"), after))
+    rows = conn.execute(f"""
+        SELECT stock, kind, id, name, category FROM (
+            SELECT stock, 0 AS kind, id, name, category FROM menu WHERE stock < :threshold
+            UNION ALL
+            SELECT stock, 1 AS kind, id, name, category FROM addons WHERE stock < :threshold
+        )
+        {where}
+        ORDER BY stock, kind, id
+        LIMIT :limit
+    """, params).fetchall()
+    return [((stock, kind, item_id), (kind, item_id),
+             ("Menu" if kind == 0 else "Add-on", item_id, name, category, stock,
+              stock_status(stock, threshold)))
+            for stock, kind, item_id, name, category in rows]
+
+
+def low_stock_items(conn, threshold):
+    """Every low-stock row, for alerts"""
+    rows, after = [], None
+    while True:
+        page = low_stock_page(conn, threshold, after, limit=500)
+        rows.extend(values for _key, _row_id, values in page)
+        if len(page) < 500:
+            return rows
+        after = page[-1][0]
+
+
+class PagedTreeView:
+    """A Treeview filled one keyset page at a time by the QueryExecutor.
+
+    The first page is requested when the view is built and the next one
+    whenever the list is scrolled to the bottom, so the window opens at once
+    however many rows there are. ``refresh`` re-reads only as many rows as
+    are loaded and applies the difference, keeping the scroll position; one
+    asked for while a page is loading runs as soon as that page arrives.
+    """
+
+    def __init__(self, executor, tree, scrollbar, fetch, scope, status_label):
+        self.executor = executor
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.fetch = fetch
+        self.scope = scope
+        self.status_label = status_label
+        self.view = MenuTreeView(tree)
+        self._rows = []
+        self._last_key = None
+        self.has_more = True
+        self._loading = False
+        self._refresh_pending = False
+        tree.configure(yscrollcommand=self._on_scroll)
+
+    def load_more(self):
+        if self._loading or self._refresh_pending or not self.has_more:
+            return
+        self._loading = True
+        after = self._last_key
+        self.executor.submit(lambda conn: self.fetch(conn, after, PAGE_SIZE),
+                             self._append, self._error, scope=self.scope)
+
+    def refresh(self):
+        if self._loading:
+            self._refresh_pending = True
+            return
+        self._refresh_pending = False
+        self._loading = True
+        count = max(len(self._rows), PAGE_SIZE)
+        self.executor.submit(lambda conn: (count, self.fetch(conn, None, count)),
+                             self._replace, self._error, scope=self.scope)
+
+    def _append(self, page):
+        self._show(self._rows + [(row_id, values) for _key, row_id, values in page],
+                   page, PAGE_SIZE)
+
+    def _replace(self, result):
+        count, page = result
+        self._show([(row_id, values) for _key, row_id, values in page], page, count)
+
+    def _show(self, rows, page, requested):
+        self._loading = False
+        self._rows = rows
+        if page:
+            self._last_key = page[-1][0]
+        elif not rows:
+            self._last_key = None
+        self.has_more = len(page) == requested
+        self.view.sync(self._rows)
+        more = " (scroll for more)" if self.has_more else ""
+        self.status_label.configure(text=f"Showing {len(self._rows)} items{more}")
+        if self._refresh_pending:
+            self.refresh()
+
+    def _error(self, error):
+        self._loading = False
+        self._refresh_pending = False
+        messagebox.showerror("Database Error", f"Error loading inventory: {error}")
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) >= 1.0:
+            self.load_more()
+
+
+def build_paged_view(app, tab, columns, fetch, widths=None):
+    """Treeview + scrollbar + status line in ``tab``, loading its first page"""
+    frame = ctk.CTkFrame(tab)
+    frame.pack(fill="both", expand=True, padx=5, pady=5)
+
+    tree = ttk.Treeview(frame, columns=columns, show="headings", height=15)
+    for col in columns:
+        tree.heading(col, text=col)
+        tree.column(col, width=(widths or {}).get(col, 110), anchor="center")
+
+    scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+    tree.pack(side="left", fill="both", expand=True)
+    scrollbar.pack(side="right", fill="y")
+
+    status_label = ctk.CTkLabel(tab, text="Loading...", anchor="w")
+    status_label.pack(fill="x", padx=10)
+
+    view = PagedTreeView(app.query_executor, tree, scrollbar, fetch,
+                         tab.winfo_toplevel(), status_label)
+    view.load_more()
+    return view
+
+
+def open_export_dialog(app, parent):
+    """Ask for tables, format and date range, then export on the query worker.
+
+    The export is not tied to the inventory window: closing it does not stop
+    the export, and the result is still reported when it finishes, including
+    a folder that cannot be written to.
+    """
+    dialog = ctk.CTkToplevel(parent)
+    dialog.title("📊 Export Report")
+    dialog.geometry("420x360")
+    dialog.transient(parent)
+    dialog.grab_set()
+
+    ctk.CTkLabel(dialog, text="Tables", font=("Arial", 14, "bold")).pack(pady=(10, 5))
+    table_vars = {}
+    for table in EXPORT_TABLES:
+        var = ctk.BooleanVar(value=True)
+        ctk.CTkCheckBox(dialog, text=table, variable=var).pack(anchor="w", padx=40, pady=2)
+        table_vars[table] = var
+
+    range_frame = ctk.CTkFrame(dialog)
+    range_frame.pack(fill="x", padx=20, pady=10)
+    ctk.CTkLabel(range_frame, text="Orders from:").grid(row=0, column=0, padx=5, pady=5)
+    since_entry = ctk.CTkEntry(range_frame, width=110, placeholder_text="YYYY-MM-DD")
+    since_entry.grid(row=0, column=1, padx=5, pady=5)
+    ctk.CTkLabel(range_frame, text="to:").grid(row=0, column=2, padx=5, pady=5)
+    until_entry = ctk.CTkEntry(range_frame, width=110, placeholder_text="YYYY-MM-DD")
+    until_entry.grid(row=0, column=3, padx=5, pady=5)
+
+    columnar = columnar_format()
+    format_var = ctk.StringVar(value="csv")
+    format_frame = ctk.CTkFrame(dialog)
+    format_frame.pack(fill="x", padx=20, pady=5)
+    ctk.CTkRadioButton(format_frame, text="CSV", variable=format_var,
+                       value="csv").pack(side="left", padx=10)
+    ctk.CTkRadioButton(format_frame, text="Parquet" if columnar == "parquet" else "JSON lines (.gz)",
+                       variable=format_var, value=columnar).pack(side="left", padx=10)
+
+    def export_failed(error):
+        if isinstance(error, sqlite3.Error):
+            messagebox.showerror("Database Error", f"Error exporting: {error}")
+        else:
+            messagebox.showerror("Export Error", f"Could not write the export: {error}")
+
+    def start_export():
+        try:
+            since, until = parse_date(since_entry.get()), parse_date(until_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Dates must be YYYY-MM-DD", parent=dialog)
+            return
+        tables = [table for table, var in table_vars.items() if var.get()]
+        if not tables:
+            messagebox.showwarning("Input Error", "Select at least one table", parent=dialog)
+            return
+        directory = filedialog.askdirectory(title="Export to folder", parent=dialog)
+        if not directory:
+            return
+        fmt = format_var.get()
+        dialog.destroy()
+        app.query_executor.submit(
+            lambda conn: export_tables(conn, directory, tables, fmt, since, until),
+            lambda written: messagebox.showinfo(
+                "Export Complete",
+                "\n".join(f"{rows} rows → {path}" for path, rows in written.items())),
+            export_failed,
+        )
+
+    ctk.CTkButton(dialog, text="Export", command=start_export).pack(pady=10)
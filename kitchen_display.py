@@ -0,0 +1,76 @@
+import argparse
+import customtkinter as ctk
+from datetime import datetime
+from tkinter import ttk
+
+from order_feed import OrderFeedSubscriber, apply_message, feed_address
+from queue_tab import QueueView
+
+ctk.set_appearance_mode("light")
+ctk.set_default_color_theme("dark-blue")
+
+
+class KitchenDisplay:
+    """Open orders for the kitchen, pushed by the order feed (no database access)"""
+
+    def __init__(self, root, address):
+        self.root = root
+        self.root.title("👨‍🍳 BrewVerse Kitchen Display")
+        self.root.geometry("1000x600")
+        self.address = address
+        self.orders = {}
+
+        ctk.CTkLabel(
+            root, text="👨‍🍳 Kitchen Orders", font=("Arial", 24, "bold")
+        ).pack(pady=10)
+        self.status_label = ctk.CTkLabel(root, text="Connecting...", font=("Arial", 14))
+        self.status_label.pack()
+
+        frame = ctk.CTkFrame(root)
+        frame.pack(fill="both", expand=True, padx=10, pady=10)
+        ttk.Style().configure("Kitchen.Treeview", font=("Arial", 14), rowheight=32)
+        columns = ("Customer", "Order", "Service", "Packaging", "Status")
+        tree = ttk.Treeview(frame, columns=columns, show="headings", style="Kitchen.Treeview")
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=150, anchor="center")
+        tree.column("Order", width=350)
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        self.view = QueueView(tree)
+
+        self.subscriber = OrderFeedSubscriber(root, address, self.on_message, self.on_connection)
+        self.subscriber.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+    def on_message(self, message):
+        apply_message(self.orders, message)
+        self.view.sync(self.orders)
+        self.status_label.configure(
+            text=f"🟢 Live · {len(self.orders)} open · updated {datetime.now():%H:%M:%S}")
+
+    def on_connection(self, connected):
+        if not connected:
+            host, port = self.address
+            self.status_label.configure(text=f"🔴 Waiting for the order feed on {host}:{port}...")
+
+    def close(self):
+        self.subscriber.close()
+        self.root.destroy()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kitchen display fed by the order feed")
+    parser.add_argument("--feed", help="host:port of the order feed (default: CAFE_ORDER_FEED or local)")
+    args = parser.parse_args()
+    if args.feed:
+        host, _, port = args.feed.rpartition(":")
+        address = (host or "127.0.0.1", int(port))
+    else:
+        address = feed_address()
+
+    root = ctk.CTk()
+    KitchenDisplay(root, address)
+    root.mainloop()
@@ -1,20 +1,38 @@
 import customtkinter as ctk
 import os
 import sqlite3
+import subprocess
+import sys
+import webbrowser
 from tkinter import messagebox, ttk
 from collections import deque
 from datetime import datetime
-
-from database import init_db, get_db_connection, IMAGES_DIR
+from urllib.parse import quote
+
+from database import init_db, db_connection, connection_manager, IMAGES_DIR
+from catalog import MenuCatalog
+from checkout import StockShortageError
+from order_store import OrderQueueStore, sales_report
+from order_service import OUT_OF_STOCK, STOCK_SHORTAGE, UNKNOWN_PRODUCT
+from order_client import RemoteOrderService, order_service_for
+from order_feed import OrderFeedPublisher, OrderFeedSubscriber, apply_message, feed_address
 from image_manager import ImageManager
-from menu_tab import setup_menu_tab
+from query_executor import QueryExecutor
+from inventory_tab import (LOW_STOCK_THRESHOLD, addon_page, build_paged_view, low_stock_items,
+                           low_stock_page, menu_page, open_export_dialog)
+from menu_search import menu_searcher
+from menu_tab import setup_menu_tab, menu_row
 from pos_tab import setup_pos_tab
 from queue_tab import setup_queue_tab
 from login import LoginWindow
+from ui_profiler import profiler_from_env
 
 ctk.set_appearance_mode("light")
 ctk.set_default_color_theme("dark-blue")
 
+SEARCH_DEBOUNCE_MS = 150
+LOW_STOCK_EMAIL_LINES = 50
+
 
 class CafeShopSystem:
     """Main café management system"""
@@ -26,17 +44,41 @@ class CafeShopSystem:
         self.root.resizable(True, True)
         self.root.eval('tk::PlaceWindow . center')
 
-        self.customer_number = 1
-        self.order_queue = []
-        self.cart_items = []
+        self.queue_store = OrderQueueStore()
         self.current_addons = []
         self.service_type = ctk.StringVar(value="Dine-in")
         self.packaging_type = ctk.StringVar(value="Standard")
-        self.product_images = {}
         self.image_manager = ImageManager(IMAGES_DIR)
+        self.query_executor = QueryExecutor(self.root)
+        self.inventory_window = None
+        self.inventory_views = {}
+        self.low_stock_threshold = LOW_STOCK_THRESHOLD
         self.current_image_path = None
+        self.catalog = MenuCatalog()
+        self.orders = order_service_for(self.catalog, self.queue_store)
+        self._search_after_id = None
+        self.order_feed = None
+        self.feed_subscriber = None
+        try:
+            self.catalog.load()
+            self.orders.load()
+            # Old uploads that never made it onto a product, from any till
+            self.image_manager.store.prune()
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Error loading saved data: {e}")
+        self.menu_search = menu_searcher(self.catalog)
+
+        # Opt-in (CAFE_PROFILE_UI=1); must wrap the handlers before widgets bind them
+        self.profiler = profiler_from_env()
+        if self.profiler is not None:
+            self.profiler.instrument(self)
 
         self.setup_ui()
+        if self.profiler is not None:
+            self.profiler.instrument(self.product_grid, ["render"], prefix="ProductGrid.")
+            self.profiler.bind_hotkey(self.root)
+        self.update_queue_display()
+        self.start_order_feed()
 
     def setup_ui(self):
         title_frame = ctk.CTkFrame(self.root)
@@ -101,48 +143,28 @@ class CafeShopSystem:
         self.apply_filters()
 
     def search_products(self, event=None):
-        self.apply_filters()
+        """Re-filter once typing pauses instead of on every key release"""
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self.apply_filters)
 
     def apply_filters(self):
-        search_term = self.search_entry.get().strip().lower()
-        for item in self.menu_tree.get_children():
-            self.menu_tree.delete(item)
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+            self._search_after_id = None
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        category = self.current_filter_category
+        subcategory = self.current_filter_subcategory
         try:
-            query = "SELECT id, name, category, subcategory, price, stock, image_path FROM menu WHERE 1=1"
-            params = []
-
-            if self.current_filter_category != "All":
-                query += " AND category = ?"
-                params.append(self.current_filter_category)
-
-            if self.current_filter_subcategory != "All Subcategories":
-                query += " AND subcategory = ?"
-                params.append(self.current_filter_subcategory)
-
-            if search_term:
-                query += " AND LOWER(name) LIKE ?"
-                params.append(f"%{search_term}%")
-
-            query += " ORDER BY category, subcategory, name"
-
-            cursor.execute(query, params)
-            for row in cursor.fetchall():
-                item_id, name, category, subcategory, price, stock, image_path = row
-                status = "Available" if stock > 0 else "Sold Out"
-                image_name = os.path.basename(image_path) if image_path else "No image"
-                self.menu_tree.insert(
-                    "",
-                    "end",
-                    values=(item_id, name, category, subcategory,
-                            f"₱{price}", stock, status, image_name)
-                )
+            products = self.menu_search.search(
+                self.search_entry.get(),
+                category=None if category == "All" else category,
+                subcategory=None if subcategory == "All Subcategories" else subcategory,
+            )
         except sqlite3.Error as e:
             messagebox.showerror("Database Error", f"Error loading menu: {e}")
-        finally:
-            conn.close()
+            return
+        self.menu_tree_view.sync([(p.id, menu_row(p)) for p in products])
 
     # ===== POS / selection / cart =====
 
@@ -152,17 +174,9 @@ class CafeShopSystem:
         if hasattr(self, 'selected_subcategory'):
             del self.selected_subcategory
 
-        for widget in self.selected_product_frame.winfo_children():
-            widget.destroy()
-
-        ctk.CTkLabel(
-            self.selected_product_frame,
-            text="Select a product from the menu",
-            font=("Arial", 12)
-        ).pack(pady=10)
-
-        for widget in self.addons_container.winfo_children():
-            widget.destroy()
+        self.selected_banner.clear()
+        self.addon_list.clear()
+        self.addon_vars = {}
 
         self.size_var.set("Regular")
         self.temp_var.set("Hot")
@@ -189,88 +203,10 @@ class CafeShopSystem:
         self.load_products_by_category(category)
 
     def load_products_by_category(self, category):
-        for widget in self.products_scrollable_frame.winfo_children():
-            widget.destroy()
-
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "SELECT name, price, stock, image_path, subcategory "
-                "FROM menu WHERE category=? AND stock > 0 "
-                "ORDER BY subcategory, name",
-                (category,)
-            )
-            products = cursor.fetchall()
-
-            if products:
-                row = 0
-                col = 0
-                max_cols = 3
-                for name, price, stock, image_path, subcategory in products:
-                    product_card = ctk.CTkFrame(
-                        self.products_scrollable_frame, width=220, height=260)
-                    product_card.grid(row=row, column=col, padx=8, pady=8, sticky="nsew")
-                    product_card.grid_propagate(False)
-
-                    try:
-                        photo = self.image_manager.get_image_preview(image_path, size=(140, 100))
-                        image_label = ctk.CTkLabel(product_card, image=photo, text="")
-                        image_label.pack(pady=6)
-                        if name not in self.product_images:
-                            self.product_images[name] = photo
-                    except Exception:
-                        icon = (
-                            "☕" if category == "Coffee" else
-                            "🍰" if category == "Sweet Treats" else
-                            "🍵" if category == "Tea" else
-                            "🔥" if category == "Hot Beverages" else
-                            "❄️" if category == "Cold Beverages" else "🥪"
-                        )
-                        ctk.CTkLabel(product_card, text=icon, font=("Arial", 35)).pack(pady=12)
-
-                    ctk.CTkLabel(
-                        product_card, text=name,
-                        font=("Arial", 13, "bold"),
-                        wraplength=200
-                    ).pack(pady=2)
-
-                    ctk.CTkLabel(
-                        product_card, text=subcategory,
-                        font=("Arial", 10), text_color="#666666"
-                    ).pack(pady=1)
-
-                    ctk.CTkLabel(
-                        product_card, text=f"₱{price}",
-                        font=("Arial", 12, "bold"),
-                        text_color="#8B4513"
-                    ).pack(pady=1)
-
-                    ctk.CTkLabel(
-                        product_card, text=f"Stock: {stock}",
-                        font=("Arial", 10), text_color="#666666"
-                    ).pack(pady=1)
-
-                    ctk.CTkButton(
-                        product_card, text="SELECT", width=180,
-                        fg_color="#8B4513", hover_color="#A0522D",
-                        command=lambda n=name, sc=subcategory: self.select_product(n, sc)
-                    ).pack(pady=6)
-
-                    col += 1
-                    if col >= max_cols:
-                        col = 0
-                        row += 1
-            else:
-                ctk.CTkLabel(
-                    self.products_scrollable_frame,
-                    text=f"No {category.lower()} products available",
-                    font=("Arial", 16)
-                ).pack(pady=50)
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error loading products: {e}")
-        finally:
-            conn.close()
+        self.product_grid.show(
+            self.catalog.products_in_category(category),
+            empty_message=f"No {category.lower()} products available"
+        )
 
         self.selected_product = None
         self.update_selected_product_info()
@@ -282,197 +218,63 @@ class CafeShopSystem:
         self.load_addons()
 
     def update_selected_product_info(self):
-        for widget in self.selected_product_frame.winfo_children():
-            widget.destroy()
-
+        product = None
         if hasattr(self, 'selected_product') and self.selected_product:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            try:
-                cursor.execute(
-                    "SELECT name, price, image_path, stock FROM menu WHERE name=?",
-                    (self.selected_product,)
-                )
-                product = cursor.fetchone()
-                if product:
-                    name, price, image_path, stock = product
-
-                    if any(x in self.selected_subcategory for x in ["Coffee", "Tea", "Drinks"]):
-                        self.temp_frame.pack(fill="x", pady=5)
-                    else:
-                        self.temp_frame.pack_forget()
-
-                    info_frame = ctk.CTkFrame(self.selected_product_frame)
-                    info_frame.pack(fill="both", expand=True, padx=5, pady=5)
-
-                    try:
-                        photo = self.image_manager.get_image_preview(image_path, size=(45, 45))
-                        image_label = ctk.CTkLabel(info_frame, image=photo, text="")
-                        image_label.pack(side="left", padx=8)
-                        if f"selected_{name}" not in self.product_images:
-                            self.product_images[f"selected_{name}"] = photo
-                    except Exception:
-                        icon = (
-                            "☕" if "Coffee" in self.selected_subcategory else
-                            "🍰" if "Sweet Treats" in self.current_category else
-                            "🍵" if "Tea" in self.selected_subcategory else
-                            "🔥" if "Hot" in self.selected_subcategory else
-                            "❄️" if "Cold" in self.selected_subcategory else "🥪"
-                        )
-                        ctk.CTkLabel(info_frame, text=icon, font=("Arial", 18)).pack(side="left", padx=8)
-
-                    details_frame = ctk.CTkFrame(info_frame)
-                    details_frame.pack(side="left", fill="both", expand=True, padx=8)
-
-                    ctk.CTkLabel(
-                        details_frame,
-                        text=f"Selected: {name}",
-                        font=("Arial", 12, "bold")
-                    ).grid(row=0, column=0, sticky="w", pady=1)
-
-                    ctk.CTkLabel(
-                        details_frame,
-                        text=f"Price: ₱{price}",
-                        font=("Arial", 11)
-                    ).grid(row=1, column=0, sticky="w", pady=1)
+            product = self.catalog.product(self.selected_product)
 
-                    ctk.CTkLabel(
-                        details_frame,
-                        text=f"Stock: {stock}",
-                        font=("Arial", 11)
-                    ).grid(row=2, column=0, sticky="w", pady=1)
+        if not product:
+            self.selected_banner.clear()
+            return
 
-                    ctk.CTkLabel(
-                        details_frame,
-                        text=f"Type: {self.selected_subcategory}",
-                        font=("Arial", 11)
-                    ).grid(row=3, column=0, sticky="w", pady=1)
-            except sqlite3.Error as e:
-                messagebox.showerror("Database Error", f"Error loading product info: {e}")
-            finally:
-                conn.close()
+        if any(x in self.selected_subcategory for x in ["Coffee", "Tea", "Drinks"]):
+            self.temp_frame.pack(fill="x", pady=5)
         else:
-            ctk.CTkLabel(
-                self.selected_product_frame,
-                text="Select a product from the menu",
-                font=("Arial", 12)
-            ).pack(pady=10)
+            self.temp_frame.pack_forget()
+
+        icon = (
+            "☕" if "Coffee" in self.selected_subcategory else
+            "🍰" if "Sweet Treats" in self.current_category else
+            "🍵" if "Tea" in self.selected_subcategory else
+            "🔥" if "Hot" in self.selected_subcategory else
+            "❄️" if "Cold" in self.selected_subcategory else "🥪"
+        )
+        self.selected_banner.show(product, self.selected_subcategory, icon)
 
     def load_addons(self):
-        for widget in self.addons_container.winfo_children():
-            widget.destroy()
-
         if not hasattr(self, 'selected_product'):
+            self.addon_list.clear()
+            self.addon_vars = {}
             return
 
-        category = self.current_category
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "SELECT name, price, stock FROM addons WHERE category=? AND stock > 0",
-                (category,)
-            )
-            addons = cursor.fetchall()
-            if addons:
-                self.addon_vars = {}
-                for name, price, stock in addons:
-                    var = ctk.BooleanVar()
-                    self.addon_vars[name] = var
-                    ctk.CTkCheckBox(
-                        self.addons_container,
-                        text=f"{name} (+₱{price})",
-                        variable=var,
-                        font=("Arial", 11)
-                    ).pack(anchor="w", pady=2)
-            else:
-                ctk.CTkLabel(
-                    self.addons_container,
-                    text="No add-ons available for this category",
-                    font=("Arial", 10)
-                ).pack(pady=10)
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error loading addons: {e}")
-        finally:
-            conn.close()
+        self.addon_vars = self.addon_list.show(
+            self.catalog.addons_for_category(self.current_category))
 
     def add_to_cart(self):
-        if not hasattr(self, 'selected_product'):
+        if not hasattr(self, 'selected_product') or not self.selected_product:
             messagebox.showwarning("Selection Error", "Please select a product first")
             return
 
         selected_product = self.selected_product
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "SELECT price, stock FROM menu WHERE name = ?",
-                (selected_product,)
-            )
-            result = cursor.fetchone()
-            if not result:
-                messagebox.showerror("Error", "Selected product not found")
-                return
-
-            base_price, stock = result
-            if stock <= 0:
-                messagebox.showerror("Out of Stock", f"Sorry, {selected_product} is out of stock!")
-                return
+        chosen_addons = [name for name, var in getattr(self, 'addon_vars', {}).items() if var.get()]
+        result = self.orders.add_item(
+            selected_product, self.size_var.get(), self.temp_var.get(), chosen_addons)
 
-            if self.size_var.get() == "Large":
-                base_price += 15
-
-            selected_addons = []
-            addons_cost = 0
-            if hasattr(self, 'addon_vars'):
-                for addon_name, var in self.addon_vars.items():
-                    if var.get():
-                        cursor.execute(
-                            "SELECT price, stock FROM addons WHERE name = ?",
-                            (addon_name,)
-                        )
-                        addon_result = cursor.fetchone()
-                        if addon_result:
-                            addon_price, addon_stock = addon_result
-                            if addon_stock <= 0:
-                                messagebox.showwarning(
-                                    "Out of Stock", f"Sorry, {addon_name} is out of stock!")
-                                continue
-                            selected_addons.append(addon_name)
-                            addons_cost += addon_price
-
-            total_price = base_price + addons_cost
-            addons_text = ", ".join(selected_addons) if selected_addons else "None"
-
-            temperature = (
-                self.temp_var.get()
-                if any(x in self.selected_subcategory for x in ["Coffee", "Tea", "Drinks"])
-                else "N/A"
-            )
+        if result.status == UNKNOWN_PRODUCT:
+            messagebox.showerror("Error", "Selected product not found")
+            return
+        if result.status == OUT_OF_STOCK:
+            messagebox.showerror("Out of Stock", f"Sorry, {selected_product} is out of stock!")
+            return
+        for addon_name in result.skipped_addons:
+            messagebox.showwarning("Out of Stock", f"Sorry, {addon_name} is out of stock!")
 
-            cart_item = {
-                'product_name': selected_product,
-                'size': self.size_var.get(),
-                'temperature': temperature,
-                'addons': selected_addons,
-                'addons_text': addons_text,
-                'price': total_price,
-                'base_price': base_price,
-                'addons_cost': addons_cost,
-            }
-
-            self.cart_items.append(cart_item)
-            self.refresh_cart()
+        self.refresh_cart()
 
-            if hasattr(self, 'addon_vars'):
-                for var in self.addon_vars.values():
-                    var.set(False)
+        if hasattr(self, 'addon_vars'):
+            for var in self.addon_vars.values():
+                var.set(False)
 
-            messagebox.showinfo("Success", f"{selected_product} added to cart!")
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error adding to cart: {e}")
-        finally:
-            conn.close()
+        messagebox.showinfo("Success", f"{selected_product} added to cart!")
 
     def remove_from_cart(self):
         selected = self.cart_tree.selection()
@@ -480,28 +282,24 @@ class CafeShopSystem:
             messagebox.showwarning("Selection Error", "Please select an item to remove")
             return
 
-        for item in selected:
-            index = self.cart_tree.index(item)
-            if 0 <= index < len(self.cart_items):
-                self.cart_items.pop(index)
+        self.orders.remove_items([self.cart_tree.index(item) for item in selected])
 
         self.refresh_cart()
 
     def clear_cart(self):
-        if not self.cart_items:
+        if not self.orders.cart:
             messagebox.showinfo("Info", "Cart is already empty")
             return
 
         if messagebox.askyesno("Confirm Clear", "Are you sure you want to clear the cart?"):
-            self.cart_items = []
+            self.orders.clear_cart()
             self.refresh_cart()
 
     def refresh_cart(self):
         for item in self.cart_tree.get_children():
             self.cart_tree.delete(item)
 
-        total_amount = 0
-        for item in self.cart_items:
+        for item in self.orders.cart:
             self.cart_tree.insert(
                 "", "end",
                 values=(
@@ -512,94 +310,32 @@ class CafeShopSystem:
                     f"₱{item['price']}"
                 )
             )
-            total_amount += item['price']
-
-        self.cart_total_label.configure(text=f"Total: ₱{total_amount:.2f}")
 
-    def check_stock_availability(self):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        try:
-            for item in self.cart_items:
-                cursor.execute(
-                    "SELECT stock FROM menu WHERE name = ?",
-                    (item['product_name'],)
-                )
-                result = cursor.fetchone()
-                if not result or result[0] <= 0:
-                    messagebox.showerror(
-                        "Out of Stock", f"Sorry, {item['product_name']} is out of stock!")
-                    return False
-
-                for addon in item['addons']:
-                    cursor.execute(
-                        "SELECT stock FROM addons WHERE name = ?",
-                        (addon,)
-                    )
-                    addon_result = cursor.fetchone()
-                    if not addon_result or addon_result[0] <= 0:
-                        messagebox.showerror(
-                            "Out of Stock", f"Sorry, {addon} is out of stock!")
-                        return False
-            return True
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error checking stock: {e}")
-            return False
-        finally:
-            conn.close()
-
-    def update_stock_after_order(self):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        try:
-            for item in self.cart_items:
-                cursor.execute(
-                    "UPDATE menu SET stock = stock - 1 WHERE name = ?",
-                    (item['product_name'],)
-                )
-                for addon in item['addons']:
-                    cursor.execute(
-                        "UPDATE addons SET stock = stock - 1 WHERE name = ?",
-                        (addon,)
-                    )
-            conn.commit()
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error updating stock: {e}")
-        finally:
-            conn.close()
+        self.cart_total_label.configure(text=f"Total: ₱{self.orders.cart_total():.2f}")
 
     def checkout(self):
-        if not self.cart_items:
+        if not self.orders.cart:
             messagebox.showwarning("Cart Empty", "Please add items to cart before checkout")
             return
 
-        total = sum(item['price'] for item in self.cart_items)
-        if not self.check_stock_availability():
+        try:
+            result = self.orders.checkout(self.service_type.get(), self.packaging_type.get())
+        except sqlite3.Error as e:
+            messagebox.showerror("Database Error", f"Error placing order: {e}")
+            return
+        if result.status == STOCK_SHORTAGE:
+            messagebox.showerror("Out of Stock", str(StockShortageError(result.shortages)))
             return
 
-        order_details = {
-            "customer": f"#{self.customer_number}",
-            "items": self.cart_items.copy(),
-            "service": self.service_type.get(),
-            "packaging": self.packaging_type.get()
-            if self.service_type.get() == "Take-out" else "None",
-            "total": total,
-            "status": "Waiting",
-        }
-
-        self.order_queue.append(order_details)
-        self.update_stock_after_order()
-
+        order = result.order
         messagebox.showinfo(
             "Order Placed",
-            f"Order #{self.customer_number} placed successfully!\n"
-            f"Total: ₱{total:.2f}\n"
-            f"Service: {self.service_type.get()}\n"
+            f"Order {order['customer']} placed successfully!\n"
+            f"Total: ₱{order['total']:.2f}\n"
+            f"Service: {order['service']}\n"
             f"Status: Waiting"
         )
 
-        self.customer_number += 1
-        self.cart_items = []
         self.refresh_cart()
         self.update_queue_display()
         self.select_category(self.current_category)
@@ -611,63 +347,37 @@ class CafeShopSystem:
         pass
 
     def prepare_next_order(self):
-        if not self.order_queue:
+        if not self.orders.open_orders:
             messagebox.showinfo("Info", "No orders in queue")
             return
 
-        for order in self.order_queue:
-            if order["status"] == "Waiting":
-                order["status"] = "Preparing"
-                messagebox.showinfo(
-                    "Order Preparation",
-                    f"Now preparing order {order['customer']}"
-                )
-                break
+        order = self.advance_order("Waiting", "Preparing")
+        if order:
+            messagebox.showinfo(
+                "Order Preparation",
+                f"Now preparing order {order['customer']}"
+            )
 
         self.update_queue_display()
 
     def serve_order(self):
-        if not self.order_queue:
+        if not self.orders.open_orders:
             messagebox.showinfo("Info", "No orders in queue")
             return
 
-        for order in self.order_queue:
-            if order["status"] == "Preparing":
-                order["status"] = "Served"
-                self.save_order_to_db(order)
-                self.show_receipt(order)
-                break
+        order = self.advance_order("Preparing", "Served")
+        if order:
+            self.show_receipt(order)
 
-        self.order_queue = [o for o in self.order_queue if o["status"] != "Served"]
         self.update_queue_display()
 
-    def save_order_to_db(self, order):
-        conn = get_db_connection()
-        cursor = conn.cursor()
+    def advance_order(self, from_status, to_status):
+        """Move the oldest order in from_status along; returns the order or None"""
         try:
-            cursor.execute("""
-                INSERT INTO orders (
-                    customer_number, order_name, add_ons, size, temperature,
-                    service_type, packaging_type, total, status, order_time
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                order["customer"],
-                ", ".join([item['product_name'] for item in order["items"]]),
-                ", ".join([item['addons_text'] for item in order["items"]]),
-                order["items"][0]['size'] if order["items"] else "Regular",
-                order["items"][0]['temperature'] if order["items"] else "Hot",
-                order["service"],
-                order["packaging"],
-                order["total"],
-                order["status"],
-                datetime.now()
-            ))
-            conn.commit()
+            return self.orders.advance(from_status, to_status)
         except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error saving order: {e}")
-        finally:
-            conn.close()
+            messagebox.showerror("Database Error", f"Error updating order: {e}")
+            return None
 
     def show_receipt(self, order):
         receipt_window = ctk.CTkToplevel(self.root)
@@ -781,21 +491,81 @@ class CafeShopSystem:
         ).pack(pady=20)
 
     def update_queue_display(self):
-        for item in self.queue_tree.get_children():
-            self.queue_tree.delete(item)
+        self.queue_view.sync(self.orders.open_orders)
+
+    # ===== Kitchen display feed =====
+
+    def feed_address(self):
+        if isinstance(self.orders, RemoteOrderService):
+            return feed_address(f"{self.orders.client.host}:{self.orders.client.port}")
+        return feed_address()
+
+    def start_order_feed(self):
+        """Publish this till's order transitions, or follow the order server's feed"""
+        host, port = self.feed_address()
+        if isinstance(self.orders, RemoteOrderService):
+            self.feed_subscriber = OrderFeedSubscriber(
+                self.root, (host, port), self.on_feed_message, self.on_feed_connection)
+            self.feed_subscriber.start()
+            return
 
-        for order in self.order_queue:
-            items_text = ", ".join([i['product_name'] for i in order["items"]])
-            self.queue_tree.insert(
-                "", "end",
-                values=(
-                    order["customer"],
-                    items_text,
-                    order["service"],
-                    order["packaging"],
-                    order["status"],
-                )
+        publisher = OrderFeedPublisher(host, port, self.orders.open_orders.values())
+        try:
+            publisher.start()
+        except OSError as e:
+            # Usually another till on this machine is already publishing on the port
+            self.feed_status_label.configure(
+                text=f"🔴 Kitchen feed off: {host}:{port} unavailable. "
+                     f"Orders from this till do not reach kitchen displays.")
+            messagebox.showwarning(
+                "Kitchen Display",
+                f"Could not start the kitchen display feed on {host}:{port}: {e}\n\n"
+                f"Orders taken on this till will not appear on any kitchen display. "
+                f"Run one till per machine, or share orders through the order server."
             )
+            return
+        self.order_feed = publisher
+        self.orders.listeners.append(publisher.publish)
+        self.feed_status_label.configure(text=f"🟢 Kitchen feed: publishing on {host}:{port}")
+
+    def on_feed_message(self, message):
+        apply_message(self.orders.open_orders, message)
+        self.update_queue_display()
+
+    def on_feed_connection(self, connected):
+        host, port = self.feed_address()
+        if connected:
+            self.feed_status_label.configure(text=f"🟢 Kitchen feed: following {host}:{port}")
+        else:
+            self.feed_status_label.configure(
+                text=f"🔴 Kitchen feed: reconnecting to {host}:{port}; the queue may be stale")
+
+    def open_kitchen_display(self):
+        if self.order_feed is None and self.feed_subscriber is None:
+            messagebox.showwarning(
+                "Kitchen Display",
+                "This till is not publishing a kitchen feed, so a display opened here "
+                "would not show its orders.")
+            return
+        host, port = self.feed_address()
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kitchen_display.py")
+        try:
+            subprocess.Popen([sys.executable, script, "--feed", f"{host}:{port}"])
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not open the kitchen display: {e}")
+
+    def close_order_feed(self):
+        if self.order_feed is not None:
+            self.order_feed.close()
+        if self.feed_subscriber is not None:
+            self.feed_subscriber.close()
+
+    def close_profiler(self):
+        """Print the handler latency summary (also on F12) and stop profiling"""
+        if self.profiler is not None:
+            self.profiler.report()
+            self.profiler.close()
+            self.profiler = None
 
     # ===== Image management =====
 
@@ -854,23 +624,15 @@ class CafeShopSystem:
             self.menu_stock_entry.delete(0, "end")
             self.menu_stock_entry.insert(0, str(values[5]))
 
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            try:
-                cursor.execute("SELECT image_path FROM menu WHERE id=?", (values[0],))
-                result = cursor.fetchone()
-                if result and result[0]:
-                    self.current_image_path = result[0]
-                    self.image_path_label.configure(text=os.path.basename(result[0]))
-                    self.show_image_preview(result[0])
-                else:
-                    self.current_image_path = None
-                    self.image_path_label.configure(text="No image")
-                    self.clear_image_preview()
-            except sqlite3.Error as e:
-                messagebox.showerror("Database Error", f"Error loading image: {e}")
-            finally:
-                conn.close()
+            product = self.catalog.product_by_id(int(values[0]))
+            if product and product.image_path:
+                self.current_image_path = product.image_path
+                self.image_path_label.configure(text=os.path.basename(product.image_path))
+                self.show_image_preview(product.image_path)
+            else:
+                self.current_image_path = None
+                self.image_path_label.configure(text="No image")
+                self.clear_image_preview()
 
     def add_product(self):
         name = self.menu_name_entry.get().strip()
@@ -890,16 +652,15 @@ class CafeShopSystem:
             messagebox.showerror("Error", "Price must be a number and stock must be an integer")
             return
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
         try:
             image_path = self.current_image_path or os.path.join(IMAGES_DIR, "default.jpg")
-            cursor.execute(
-                "INSERT INTO menu (name, category, subcategory, price, stock, image_path) "
-                "VALUES (?, ?, ?, ?, ?, ?)",
-                (name, category, subcategory, price, stock, image_path)
-            )
-            conn.commit()
+            with db_connection() as conn:
+                cursor = conn.execute(
+                    "INSERT INTO menu (name, category, subcategory, price, stock, image_path) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (name, category, subcategory, price, stock, image_path)
+                )
+            self.catalog.refresh_product(cursor.lastrowid)
             self.load_menu()
             messagebox.showinfo("Success", f"Product '{name}' added successfully!")
             self.clear_form()
@@ -907,8 +668,6 @@ class CafeShopSystem:
             messagebox.showerror("Error", f"Product '{name}' already exists!")
         except sqlite3.Error as e:
             messagebox.showerror("Database Error", f"Error adding product: {e}")
-        finally:
-            conn.close()
 
     def update_product(self):
         selected = self.menu_tree.selection()
@@ -929,8 +688,6 @@ class CafeShopSystem:
             messagebox.showwarning("Input Error", "Please enter at least one field to update")
             return
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
         try:
             updates = []
             params = []
@@ -969,18 +726,22 @@ class CafeShopSystem:
                 messagebox.showwarning("Input Error", "No changes to update")
                 return
 
+            previous = self.catalog.product_by_id(item_id)
+            previous_image = previous.image_path if previous else None
+
             params.append(item_id)
             query = f"UPDATE menu SET {', '.join(updates)} WHERE id = ?"
-            cursor.execute(query, params)
-            conn.commit()
+            with db_connection() as conn:
+                conn.execute(query, params)
+            self.catalog.refresh_product(item_id)
+            if self.current_image_path and previous_image != self.current_image_path:
+                self.image_manager.release_image(previous_image)
 
             self.load_menu()
             messagebox.showinfo("Success", "Product updated successfully!")
             self.clear_form()
         except sqlite3.Error as e:
             messagebox.showerror("Database Error", f"Error updating product: {e}")
-        finally:
-            conn.close()
 
     def delete_product(self):
         selected = self.menu_tree.selection()
@@ -994,29 +755,23 @@ class CafeShopSystem:
         if not messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete '{product_name}'?"):
             return
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute("SELECT image_path FROM menu WHERE id=?", (item['values'][0],))
-            result = cursor.fetchone()
-            image_path = result[0] if result else None
+            with db_connection() as conn:
+                result = conn.execute(
+                    "SELECT image_path FROM menu WHERE id=?", (item['values'][0],)
+                ).fetchone()
+                image_path = result[0] if result else None
 
-            cursor.execute("DELETE FROM menu WHERE id = ?", (item['values'][0],))
-            conn.commit()
+                conn.execute("DELETE FROM menu WHERE id = ?", (item['values'][0],))
+            self.catalog.remove_product(item['values'][0])
 
-            if image_path and os.path.exists(image_path) and not image_path.endswith("default.jpg"):
-                try:
-                    os.remove(image_path)
-                except Exception as e:
-                    print(f"Warning: Could not delete image file: {e}")
+            self.image_manager.delete_image(image_path)
 
             self.load_menu()
             messagebox.showinfo("Success", f"Product '{product_name}' deleted successfully!")
             self.clear_form()
         except sqlite3.Error as e:
             messagebox.showerror("Database Error", f"Error deleting product: {e}")
-        finally:
-            conn.close()
 
     def clear_form(self):
         self.menu_name_entry.delete(0, "end")
@@ -1046,18 +801,15 @@ class CafeShopSystem:
         item = self.menu_tree.item(selected[0])
         product_name = item['values'][1]
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute("UPDATE menu SET stock = ? WHERE id = ?", (stock, item['values'][0]))
-            conn.commit()
+            with db_connection() as conn:
+                conn.execute("UPDATE menu SET stock = ? WHERE id = ?", (stock, item['values'][0]))
+            self.catalog.set_product_stock(item['values'][0], stock)
             self.load_menu()
             messagebox.showinfo("Success", f"Product '{product_name}' restocked to {stock}")
             self.menu_stock_entry.delete(0, "end")
         except sqlite3.Error as e:
             messagebox.showerror("Database Error", f"Error restocking product: {e}")
-        finally:
-            conn.close()
 
     def on_takeout_selected(self):
         if not self.packaging_frame.winfo_ismapped():
@@ -1081,38 +833,25 @@ class CafeShopSystem:
             ).pack(side="left", padx=5)
 
     def show_sales_report(self):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT SUM(total) FROM orders WHERE status = 'Served'")
-            total_sales = cursor.fetchone()[0] or 0
-
-            cursor.execute("SELECT COUNT(*) FROM orders WHERE status = 'Served'")
-            order_count = cursor.fetchone()[0]
-
-            cursor.execute("""
-                SELECT order_name, COUNT(*) as count
-                FROM orders
-                WHERE status = 'Served'
-                GROUP BY order_name
-                ORDER BY count DESC
-                LIMIT 5
-            """)
-            popular_items = cursor.fetchall()
-
-            report_text = "📊 Sales Report\n\n"
-            report_text += f"Total Orders: {order_count}\n"
-            report_text += f"Total Revenue: ₱{total_sales:.2f}\n\n"
-            report_text += "Most Popular Items:\n"
-            for item, count in popular_items:
-                report_text += f"• {item}: {count} orders\n"
-
-            messagebox.showinfo("Sales Report", report_text)
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Error generating report: {e}")
-        finally:
-            conn.close()
+        self.query_executor.submit(
+            sales_report,
+            self.display_sales_report,
+            lambda e: messagebox.showerror("Database Error", f"Error generating report: {e}"),
+        )
 
+    def display_sales_report(self, report):
+        report_text = "📊 Sales Report\n\n"
+        report_text += f"Total Orders: {report['order_count']}\n"
+        report_text += f"Total Revenue: ₱{report['revenue']:.2f}\n\n"
+        report_text += "Most Popular Items:\n"
+        for item, count in report['popular']:
+            report_text += f"• {item}: {count} sold\n"
+        if report['peak_hours']:
+            report_text += "\nBusiest Hours:\n"
+            for hour, served in report['peak_hours']:
+                report_text += f"• {hour}:00: {served} orders\n"
+
+        messagebox.showinfo("Sales Report", report_text)
 
     def show_sales_inventory(self):
         inventory_window = ctk.CTkToplevel(self.root)
@@ -1120,6 +859,10 @@ class CafeShopSystem:
         inventory_window.geometry("1000x700")
         inventory_window.transient(self.root)
         inventory_window.grab_set()
+        inventory_window.protocol(
+            "WM_DELETE_WINDOW", lambda: self.close_inventory_window(inventory_window))
+        self.inventory_window = inventory_window
+        self.inventory_views = {}
 
         main_frame = ctk.CTkFrame(inventory_window)
         main_frame.pack(fill="both", expand=True, padx=10, pady=10)
@@ -1162,21 +905,108 @@ class CafeShopSystem:
 
         ctk.CTkButton(
             button_frame, text="🗑️ Close",
-            command=inventory_window.destroy,
+            command=lambda: self.close_inventory_window(inventory_window),
             width=100
         ).pack(side="right", padx=5)
 
+    def close_inventory_window(self, window):
+        """Drop the window's pending queries before destroying it"""
+        self.query_executor.cancel(window)
+        self.inventory_views = {}
+        self.inventory_window = None
+        window.destroy()
+
+    def setup_menu_inventory_tab(self, tab):
+        self.inventory_views["menu"] = build_paged_view(
+            self, tab,
+            ("ID", "Name", "Category", "Subcategory", "Price", "Stock", "Status"),
+            lambda conn, after, limit: menu_page(conn, self.low_stock_threshold, after, limit),
+            widths={"ID": 50, "Name": 180},
+        )
+
+    def setup_addons_inventory_tab(self, tab):
+        self.inventory_views["addons"] = build_paged_view(
+            self, tab,
+            ("ID", "Name", "Category", "Price", "Stock", "Status"),
+            lambda conn, after, limit: addon_page(conn, self.low_stock_threshold, after, limit),
+            widths={"ID": 50, "Name": 180},
+        )
+
+    def setup_low_stock_tab(self, tab):
+        threshold_frame = ctk.CTkFrame(tab)
+        threshold_frame.pack(fill="x", padx=5, pady=5)
+        ctk.CTkLabel(threshold_frame, text="Alert when stock is below:").pack(side="left", padx=5)
+        threshold_entry = ctk.CTkEntry(threshold_frame, width=80)
+        threshold_entry.insert(0, str(self.low_stock_threshold))
+        threshold_entry.pack(side="left", padx=5)
+        ctk.CTkButton(
+            threshold_frame, text="Apply", width=80,
+            command=lambda: self.set_low_stock_threshold(threshold_entry.get())
+        ).pack(side="left", padx=5)
+
+        self.inventory_views["low_stock"] = build_paged_view(
+            self, tab,
+            ("Type", "ID", "Name", "Category", "Stock", "Status"),
+            lambda conn, after, limit: low_stock_page(conn, self.low_stock_threshold, after, limit),
+            widths={"ID": 50, "Name": 180},
+        )
+
+    def set_low_stock_threshold(self, text):
+        try:
+            self.low_stock_threshold = int(text)
+        except ValueError:
+            messagebox.showerror("Error", "Threshold must be an integer")
+            return
+        # The Status column of every tab depends on the threshold
+        self.refresh_inventory_data()
+
+    def refresh_inventory_data(self):
+        for view in self.inventory_views.values():
+            view.refresh()
+
+    def export_inventory_report(self):
+        open_export_dialog(self, self.inventory_window)
+
+    def email_low_stock_alerts(self):
+        threshold = self.low_stock_threshold
+        self.query_executor.submit(
+            lambda conn: low_stock_items(conn, threshold),
+            self.send_low_stock_email,
+            lambda e: messagebox.showerror("Database Error", f"Error checking stock: {e}"),
+        )
+
+    def send_low_stock_email(self, items):
+        """Open the default mail client with the low-stock list filled in"""
+        if not items:
+            messagebox.showinfo("Low Stock Alerts", "Nothing is below the alert threshold.")
+            return
+        lines = [f"{kind}: {name} ({category}) - {stock} left"
+                 for kind, _item_id, name, category, stock, _status in items[:LOW_STOCK_EMAIL_LINES]]
+        if len(items) > LOW_STOCK_EMAIL_LINES:
+            lines.append(f"...and {len(items) - LOW_STOCK_EMAIL_LINES} more")
+        subject = f"Low stock alert: {len(items)} items below {self.low_stock_threshold}"
+        webbrowser.open(f"mailto:?subject={quote(subject)}&body={quote(chr(10).join(lines))}")
 
     def logout(self):
         if messagebox.askyesno("Logout", "Are you sure you want to log out?"):
+            self.image_manager.shutdown()
+            self.query_executor.shutdown()
+            self.close_order_feed()
+            self.close_profiler()
+            connection_manager.close_all()
             self.root.destroy()
             start_app_with_login()
 
 
 def start_app():
     root = ctk.CTk()
-    CafeShopSystem(root)
+    app = CafeShopSystem(root)
     root.mainloop()
+    app.image_manager.shutdown()
+    app.query_executor.shutdown()
+    app.close_order_feed()
+    app.close_profiler()
+    connection_manager.close_all()
 
 
 def start_app_with_login():
@@ -0,0 +1,230 @@
+import heapq
+import sqlite3
+from collections import Counter
+from difflib import SequenceMatcher
+
+from database import db_connection
+
+NGRAM_SIZE = 3
+# Above this many products, search from menu_fts instead of building the
+# in-memory index (when the SQLite build has FTS5)
+FTS_MIN_PRODUCTS = 20000
+# Fuzzy fallback: the names sharing the most trigrams with the term are
+# scored against it and kept above this SequenceMatcher ratio
+FUZZY_CANDIDATES = 200
+FUZZY_MIN_SCORE = 0.75
+
+
+def name_ngrams(text, n=NGRAM_SIZE):
+    """Every substring of ``text`` up to n characters long"""
+    return {text[i:i + size] for size in range(1, n + 1) for i in range(len(text) - size + 1)}
+
+
+def trigrams(text):
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def fuzzy_score(term, name):
+    """Best match ratio between ``term`` and any run of as many words in ``name``"""
+    words = name.lower().split()
+    width = len(term.split())
+    return max(SequenceMatcher(None, term, " ".join(words[i:i + width])).ratio()
+               for i in range(max(1, len(words) - width + 1)))
+
+
+def rank_fuzzy(term, candidates):
+    """(id-or-position, name) candidates that pass FUZZY_MIN_SCORE, best first"""
+    scored = [(fuzzy_score(term, name), key) for key, name in candidates]
+    scored = [hit for hit in scored if hit[0] >= FUZZY_MIN_SCORE]
+    scored.sort(key=lambda hit: -hit[0])
+    return [key for _score, key in scored]
+
+
+def to_bitset(positions, size):
+    """Int with the given bit positions set, built in one pass"""
+    buf = bytearray((size + 7) // 8)
+    for position in positions:
+        buf[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buf, "little")
+
+
+def iter_bits(mask):
+    """Positions of the set bits in ``mask``, lowest first"""
+    bits = bin(mask)[:1:-1]
+    position = bits.find("1")
+    while position != -1:
+        yield position
+        position = bits.find("1", position + 1)
+
+
+class MenuSearchIndex:
+    """Substring search over the menu catalog without touching the database.
+
+    Products get a bit position in (category, subcategory, name) order, and
+    every name n-gram, category and subcategory maps to an int bitset of the
+    products that carry it. A query ANDs the bitsets of the term's n-grams
+    with the filter bitsets and only confirms the survivors with ``in``, so
+    results keep the LIKE '%term%' semantics of the old query and come out
+    already sorted. The index is rebuilt lazily when catalog.layout_version
+    moves; stock changes from sales do not touch it.
+
+    When nothing contains the term, the names sharing most of its trigrams
+    are ranked with rank_fuzzy instead, so small typos still find the item.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._version = None
+        self._products = []
+        self._names = []
+        self._all = 0
+        self._ngram_positions = {}
+        self._ngrams = {}
+        self._categories = {}
+        self._subcategories = {}
+
+    def _ngram_bits(self, gram):
+        bits = self._ngrams.get(gram)
+        if bits is None:
+            bits = to_bitset(self._ngram_positions.get(gram, ()), len(self._products))
+            self._ngrams[gram] = bits
+        return bits
+
+    def _rebuild(self):
+        products = sorted(self.catalog.all_products(),
+                          key=lambda p: (p.category, p.subcategory, p.name, p.id))
+        self._products = products
+        self._names = [p.name.lower() for p in products]
+        self._all = (1 << len(products)) - 1
+
+        ngrams, categories, subcategories = {}, {}, {}
+        for position, product in enumerate(products):
+            for gram in name_ngrams(self._names[position]):
+                ngrams.setdefault(gram, []).append(position)
+            categories.setdefault(product.category, []).append(position)
+            subcategories.setdefault(product.subcategory, []).append(position)
+
+        size = len(products)
+        # Most n-grams are rare, so their bitsets are only built when queried
+        self._ngram_positions = ngrams
+        self._ngrams = {}
+        self._categories = {key: to_bitset(p, size) for key, p in categories.items()}
+        self._subcategories = {key: to_bitset(p, size) for key, p in subcategories.items()}
+        self._version = self.catalog.layout_version
+
+    def search(self, term="", category=None, subcategory=None):
+        """Products whose name contains ``term``, optionally within a category/subcategory"""
+        if self._version != self.catalog.layout_version:
+            self._rebuild()
+
+        mask = self._all
+        if category is not None:
+            mask &= self._categories.get(category, 0)
+        if subcategory is not None:
+            mask &= self._subcategories.get(subcategory, 0)
+
+        term = term.strip().lower()
+        if not term:
+            return [self._products[i] for i in iter_bits(mask)]
+
+        if len(term) <= NGRAM_SIZE:
+            # Short terms are n-grams themselves, so their bitset is exact
+            mask &= self._ngram_bits(term)
+            return [self._products[i] for i in iter_bits(mask)]
+
+        candidates = mask
+        for gram in trigrams(term):
+            mask &= self._ngram_bits(gram)
+            if not mask:
+                break
+        matches = [self._products[i] for i in iter_bits(mask) if term in self._names[i]]
+        return matches or self._fuzzy(term, candidates)
+
+    def _fuzzy(self, term, candidates):
+        shared = Counter()
+        for gram in trigrams(term):
+            shared.update(self._ngram_positions.get(gram, ()))
+        if candidates != self._all:
+            allowed = set(iter_bits(candidates))
+            shared = Counter({p: n for p, n in shared.items() if p in allowed})
+        closest = heapq.nlargest(FUZZY_CANDIDATES, shared.items(), key=lambda hit: (hit[1], -hit[0]))
+        ranked = rank_fuzzy(term, [(position, self._names[position]) for position, _n in closest])
+        return [self._products[position] for position in ranked]
+
+
+class MenuFtsSearch:
+    """Same interface as MenuSearchIndex, answered by the menu_fts table.
+
+    For catalogs too big to index in memory. Terms of three or more
+    characters become a trigram phrase MATCH on the name column; shorter
+    terms cannot be expressed as trigrams and use the LIKE query. Results
+    map back to the catalog's Product records by id. CROSS JOIN keeps
+    menu_fts as the outer loop; otherwise the planner may walk a category
+    index and run the MATCH once per row.
+    """
+
+    ORDER = " ORDER BY m.category, m.subcategory, m.name, m.id"
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def search(self, term="", category=None, subcategory=None):
+        term = term.strip().lower()
+        filters, params = "", []
+        if category is not None:
+            filters += " AND m.category = ?"
+            params.append(category)
+        if subcategory is not None:
+            filters += " AND m.subcategory = ?"
+            params.append(subcategory)
+
+        with db_connection() as conn:
+            if len(term) < NGRAM_SIZE:
+                rows = conn.execute(
+                    f"SELECT m.id FROM menu m WHERE LOWER(m.name) LIKE ?{filters}{self.ORDER}",
+                    [f"%{term}%", *params]
+                ).fetchall()
+                return self._products(rows)
+
+            rows = conn.execute(
+                f"SELECT m.id FROM menu_fts CROSS JOIN menu m ON m.id = menu_fts.rowid "
+                f"WHERE menu_fts MATCH ?{filters}{self.ORDER}",
+                [f"name : {fts_phrase(term)}", *params]
+            ).fetchall()
+            if rows:
+                return self._products(rows)
+
+            rows = conn.execute(
+                f"SELECT m.id, m.name FROM menu_fts CROSS JOIN menu m ON m.id = menu_fts.rowid "
+                f"WHERE menu_fts MATCH ?{filters} ORDER BY rank LIMIT ?",
+                [f"name : ({' OR '.join(map(fts_phrase, sorted(trigrams(term))))})",
+                 *params, FUZZY_CANDIDATES]
+            ).fetchall()
+        return self._products([(product_id,) for product_id in rank_fuzzy(term, rows)])
+
+    def _products(self, rows):
+        products = (self.catalog.product_by_id(product_id) for (product_id,) in rows)
+        return [p for p in products if p is not None]
+
+
+def fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def menu_fts_enabled():
+    """Whether the v6 migration created menu_fts on this database"""
+    try:
+        with db_connection() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'menu_fts'"
+            ).fetchone()
+    except sqlite3.Error:
+        return False
+    return row is not None
+
+
+def menu_searcher(catalog):
+    """The in-memory index, or menu_fts once the catalog is large enough"""
+    if len(catalog.all_products()) >= FTS_MIN_PRODUCTS and menu_fts_enabled():
+        return MenuFtsSearch(catalog)
+    return MenuSearchIndex(catalog)
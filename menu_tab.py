@@ -1,4 +1,5 @@
 import customtkinter as ctk
+import os
 from tkinter import ttk
 
 
@@ -105,6 +106,7 @@ def setup_menu_tab(app):
     app.menu_tree.configure(yscrollcommand=scrollbar.set)
     app.menu_tree.pack(side="left", fill="both", expand=True)
     scrollbar.pack(side="right", fill="y")
+    app.menu_tree_view = MenuTreeView(app.menu_tree)
 
     control_frame = ctk.CTkFrame(right_frame)
     control_frame.pack(fill="x", padx=5, pady=5)
@@ -195,3 +197,54 @@ def setup_menu_tab(app):
 
     app.menu_tree.bind('<<TreeviewSelect>>', app.on_menu_selection)
     app.load_menu()
+
+
+def menu_row(product):
+    """Column values shown for a product in the menu tree"""
+    status = "Available" if product.stock > 0 else "Sold Out"
+    image_name = os.path.basename(product.image_path) if product.image_path else "No image"
+    return (product.id, product.name, product.category, product.subcategory,
+            f"₱{product.price}", product.stock, status, image_name)
+
+
+class MenuTreeView:
+    """Apply search results to the menu Treeview as a diff.
+
+    Like queue_tab.QueueView, but rows follow the order of the results: new
+    rows are inserted at their index, and kept rows are only moved when the
+    result order differs from what is on screen.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._rows = {}
+        self._order = []
+
+    def sync(self, rows):
+        """Show ``rows``, an ordered list of (product id, values)"""
+        wanted = dict(rows)
+        gone = [product_id for product_id in self._rows if product_id not in wanted]
+        if gone:
+            self.tree.delete(*[self._rows.pop(product_id)[0] for product_id in gone])
+
+        kept = [product_id for product_id in self._order if product_id in wanted]
+        in_order = kept == [product_id for product_id, _values in rows if product_id in self._rows]
+
+        for index, (product_id, values) in enumerate(rows):
+            row = self._rows.get(product_id)
+            if row is None:
+                item_id = self.tree.insert("", index, values=values)
+                self._rows[product_id] = (item_id, values)
+                continue
+            if not in_order:
+                self.tree.move(row[0], "", index)
+            if row[1] != values:
+                self.tree.item(row[0], values=values)
+                self._rows[product_id] = (row[0], values)
+        self._order = [product_id for product_id, _values in rows]
+
+    def clear(self):
+        if self._rows:
+            self.tree.delete(*[item_id for item_id, _values in self._rows.values()])
+        self._rows.clear()
+        self._order = []
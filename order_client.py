@@ -0,0 +1,114 @@
+import json
+import os
+import sqlite3
+from http.client import HTTPConnection, HTTPException
+
+from checkout import aggregate_cart
+from order_service import CheckoutResult, OrderService, PLACED, STOCK_SHORTAGE
+
+ORDER_SERVER_ENV = "CAFE_ORDER_SERVER"
+TIMEOUT_S = 5
+
+
+class OrderServerError(sqlite3.OperationalError):
+    """The order server is unreachable or failed the request.
+
+    A sqlite3.Error, so the tills' existing "Database Error" handling shows it.
+    """
+
+
+class OrderApiClient:
+    """Keep-alive JSON client for order_server.OrderServer (one per thread)"""
+
+    def __init__(self, address, timeout=TIMEOUT_S):
+        host, _, port = address.rpartition(":")
+        self.host = host or "127.0.0.1"
+        self.port = int(port)
+        self.timeout = timeout
+        self._conn = None
+
+    def request(self, method, path, body=None):
+        """Send one request; returns (HTTP status, decoded JSON payload)"""
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        # Reads are safe to resend over a fresh connection; writes are not
+        attempts = 2 if method == "GET" else 1
+        for attempt in range(attempts):
+            if self._conn is None:
+                self._conn = HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self._conn.request(method, path, body=data,
+                                   headers={"Content-Type": "application/json"})
+                response = self._conn.getresponse()
+                payload = json.loads(response.read() or b"{}")
+                return response.status, payload
+            except (OSError, HTTPException, ValueError) as e:
+                self.close()
+                if attempt == attempts - 1:
+                    raise OrderServerError(
+                        f"Order server {self.host}:{self.port} unavailable: {e}") from e
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class RemoteOrderService(OrderService):
+    """OrderService whose checkout and queue live on a shared order server.
+
+    The cart and its pricing stay local for instant feedback; the server
+    re-prices each order, reserves stock and assigns the customer number.
+    """
+
+    def __init__(self, catalog, client):
+        super().__init__(catalog)
+        self.client = client
+
+    def load(self):
+        payload = self._call("GET", "/queue")
+        self.open_orders = {order["id"]: order for order in payload["orders"]}
+        self.customer_number = payload["next_customer"]
+
+    def place_order(self, items, service="Dine-in", packaging="None", customer=None):
+        """Checkout on the server; ``customer`` is ignored, the server numbers orders"""
+        body = {
+            "items": [{key: item[key] for key in ("product_name", "size", "temperature", "addons")}
+                      for item in items],
+            "service": service,
+            "packaging": packaging,
+        }
+        status, payload = self.client.request("POST", "/orders", body)
+        if status == 409 and payload.get("status") == STOCK_SHORTAGE:
+            return CheckoutResult(STOCK_SHORTAGE, None, [tuple(s) for s in payload["shortages"]])
+        if status != 201:
+            raise OrderServerError(payload.get("error", f"Order server returned HTTP {status}"))
+
+        order = payload["order"]
+        self.catalog.apply_sale(*aggregate_cart(order["items"]))
+        self.open_orders[order["id"]] = order
+        self.customer_number = payload["next_customer"]
+        return CheckoutResult(PLACED, order)
+
+    def advance(self, from_status, to_status):
+        order = self._call("POST", "/queue/advance", {"from": from_status, "to": to_status})["order"]
+        if order is None:
+            return None
+        if to_status == "Served":
+            self.open_orders.pop(order["id"], None)
+        else:
+            self.open_orders[order["id"]] = order
+        return order
+
+    def _call(self, method, path, body=None):
+        status, payload = self.client.request(method, path, body)
+        if status != 200:
+            raise OrderServerError(payload.get("error", f"Order server returned HTTP {status}"))
+        return payload
+
+
+def order_service_for(catalog, queue_store=None):
+    """A RemoteOrderService if CAFE_ORDER_SERVER=host:port is set, else a local one"""
+    address = os.environ.get(ORDER_SERVER_ENV)
+    if address:
+        return RemoteOrderService(catalog, OrderApiClient(address))
+    return OrderService(catalog, queue_store)
@@ -0,0 +1,206 @@
+import json
+import os
+import queue
+import socket
+import threading
+from tkinter import TclError
+
+from order_service import ORDER_PLACED, ORDER_STATUS
+
+FEED_HOST = "127.0.0.1"
+FEED_PORT = 8766
+ORDER_FEED_ENV = "CAFE_ORDER_FEED"
+RECONNECT_S = 1.0
+# Messages queued for one display before it is treated as stalled and dropped
+SUBSCRIBER_BACKLOG = 1000
+
+# Messages, one JSON object per line
+SNAPSHOT = "snapshot"
+
+
+def feed_address(server_address=None):
+    """(host, port) of the feed: CAFE_ORDER_FEED, else the order server's host, else local"""
+    address = os.environ.get(ORDER_FEED_ENV)
+    if address:
+        host, _, port = address.rpartition(":")
+        return host or FEED_HOST, int(port)
+    if server_address:
+        return server_address.rpartition(":")[0] or FEED_HOST, FEED_PORT
+    return FEED_HOST, FEED_PORT
+
+
+def apply_message(orders, message):
+    """Update an id -> order dict of open orders from one feed message"""
+    if message["type"] == SNAPSHOT:
+        orders.clear()
+        orders.update((order["id"], order) for order in message["orders"])
+    elif message["type"] in (ORDER_PLACED, ORDER_STATUS):
+        order = message["order"]
+        if order["status"] == "Served":
+            orders.pop(order["id"], None)
+        else:
+            orders[order["id"]] = order
+    return orders
+
+
+def _encode(message):
+    return (json.dumps(message, default=str) + "\n").encode("utf-8")
+
+
+class _Subscriber:
+    __slots__ = ("conn", "outbox")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.outbox = queue.Queue(maxsize=SUBSCRIBER_BACKLOG)
+
+    def disconnect(self):
+        """Unblock and end the send loop; the display resyncs from a snapshot on reconnect"""
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.outbox.put_nowait(None)
+        except queue.Full:
+            pass
+
+
+class OrderFeedPublisher:
+    """Push order transitions to kitchen displays over a local socket.
+
+    Register ``publish`` as an OrderService listener. Every subscriber gets
+    a snapshot of the open orders when it connects and then each event as a
+    line of JSON, sent from its own thread so a slow display never holds up
+    the till. A display that falls SUBSCRIBER_BACKLOG messages behind is
+    disconnected rather than buffered without limit. The snapshot comes
+    from the publisher's own copy of the queue, kept in step with the
+    events under one lock, so nothing is missed or repeated between the two.
+    """
+
+    def __init__(self, host=FEED_HOST, port=FEED_PORT, orders=()):
+        self.host = host
+        self.port = port
+        self._lock = threading.Lock()
+        self._orders = {order["id"]: dict(order) for order in orders}
+        self._subscribers = []
+        self._sequence = 0
+        self._socket = None
+
+    def start(self):
+        """Start listening; raises OSError if the port is taken"""
+        self._socket = socket.create_server((self.host, self.port))
+        threading.Thread(target=self._accept_loop, name="order-feed", daemon=True).start()
+
+    def publish(self, event, order):
+        with self._lock:
+            self._sequence += 1
+            apply_message(self._orders, {"type": event, "order": dict(order)})
+            message = _encode({"type": event, "seq": self._sequence, "order": order})
+            for subscriber in list(self._subscribers):
+                try:
+                    subscriber.outbox.put_nowait(message)
+                except queue.Full:
+                    self._subscribers.remove(subscriber)
+                    subscriber.disconnect()
+
+    def close(self):
+        if self._socket is not None:
+            try:
+                # Wakes the thread blocked in accept(); close() alone does not on Linux
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+            self._socket = None
+        with self._lock:
+            for subscriber in self._subscribers:
+                subscriber.disconnect()
+            self._subscribers = []
+
+    def _accept_loop(self):
+        listener = self._socket
+        while True:
+            try:
+                conn, _address = listener.accept()
+            except OSError:
+                # Listening socket closed
+                return
+            subscriber = _Subscriber(conn)
+            with self._lock:
+                subscriber.outbox.put(_encode({"type": SNAPSHOT, "seq": self._sequence,
+                                               "orders": list(self._orders.values())}))
+                self._subscribers.append(subscriber)
+            threading.Thread(target=self._send_loop, args=(subscriber,),
+                             name="order-feed-send", daemon=True).start()
+
+    def _send_loop(self, subscriber):
+        try:
+            while True:
+                message = subscriber.outbox.get()
+                if message is None:
+                    return
+                subscriber.conn.sendall(message)
+        except OSError:
+            # Display closed, went away or was dropped for falling behind
+            pass
+        finally:
+            with self._lock:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
+            subscriber.conn.close()
+
+
+class OrderFeedSubscriber:
+    """Follow a feed on a background thread, delivering messages on the Tk thread.
+
+    ``on_message(message)`` and ``on_connection(connected)`` are called via
+    root.after. Reconnects every RECONNECT_S while the publisher is down;
+    the snapshot sent on each connect brings the display back in step.
+    """
+
+    def __init__(self, root, address, on_message, on_connection=None):
+        self.root = root
+        self.address = address
+        self.on_message = on_message
+        self.on_connection = on_connection
+        self._closed = threading.Event()
+        self._socket = None
+
+    def start(self):
+        threading.Thread(target=self._run, name="order-feed-subscriber", daemon=True).start()
+
+    def close(self):
+        self._closed.set()
+        sock = self._socket
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _run(self):
+        while not self._closed.is_set():
+            try:
+                with socket.create_connection(self.address, timeout=RECONNECT_S) as sock:
+                    sock.settimeout(None)
+                    self._socket = sock
+                    self._deliver(self.on_connection, True)
+                    for line in sock.makefile("rb"):
+                        self._deliver(self.on_message, json.loads(line))
+            except (OSError, ValueError):
+                pass
+            finally:
+                self._socket = None
+            if not self._closed.is_set():
+                self._deliver(self.on_connection, False)
+                self._closed.wait(RECONNECT_S)
+
+    def _deliver(self, callback, value):
+        if callback is None:
+            return
+        try:
+            self.root.after(0, callback, value)
+        except (RuntimeError, TclError):
+            # The window is gone
+            self._closed.set()
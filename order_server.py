@@ -0,0 +1,372 @@
+import argparse
+import asyncio
+import json
+import sqlite3
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+from catalog import MenuCatalog
+from database import connection_manager, db_connection, init_db
+from order_feed import FEED_PORT, OrderFeedPublisher
+from order_service import (EMPTY_CART, NO_TEMPERATURE, PLACED, SIZES, TEMPERATURES,
+                           OrderService)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+BATCH_SIZE = 64
+MAX_BODY = 1 << 20
+
+SERVICE_TYPES = ("Dine-in", "Take-out")
+# Cart lines for food come back from the tills as NO_TEMPERATURE
+LINE_TEMPERATURES = (*TEMPERATURES, NO_TEMPERATURE)
+QUEUE_STEPS = {("Waiting", "Preparing"), ("Preparing", "Served")}
+
+
+class ApiError(Exception):
+    """A request the server refuses; becomes an HTTP error response"""
+
+    def __init__(self, http_status, message, **extra):
+        super().__init__(message)
+        self.http_status = http_status
+        self.payload = {"error": message, **extra}
+
+
+class _Command:
+    __slots__ = ("handler", "body", "writes", "future")
+
+    def __init__(self, handler, body, writes, future):
+        self.handler = handler
+        self.body = body
+        self.writes = writes
+        self.future = future
+
+
+def product_json(product):
+    return {"id": product.id, "name": product.name, "category": product.category,
+            "subcategory": product.subcategory, "price": product.price, "stock": product.stock}
+
+
+def addon_json(addon):
+    return {"id": addon.id, "name": addon.name, "category": addon.category,
+            "price": addon.price, "stock": addon.stock}
+
+
+class OrderServer:
+    """Local HTTP/JSON front for one OrderService shared by several tills.
+
+    Requests are parsed on the asyncio loop and queued as commands for a
+    single writer thread, the only code that touches the OrderService or
+    writes orders. Whatever has queued up while the previous batch was
+    committing runs as the next batch: reads are answered first from the
+    committed state, then every write runs in its own SAVEPOINT inside one
+    IMMEDIATE transaction and all of them are acknowledged after the one
+    COMMIT. Customer numbers are handed out here, so tills never collide.
+
+    The server keeps the menu in memory; POST /menu/reload picks up menu or
+    stock edits made directly in the database. Given an OrderFeedPublisher,
+    each batch's order events are published once the batch has committed.
+    """
+
+    def __init__(self, service, host=DEFAULT_HOST, port=DEFAULT_PORT, batch_size=BATCH_SIZE,
+                 feed=None):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.feed = feed
+        self._events = []
+        if feed is not None:
+            service.listeners.append(lambda event, order: self._events.append((event, order)))
+        self.stats = {"batches": 0, "commands": 0, "largest_batch": 0}
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="order-writer")
+        self._commands = None
+        self._server = None
+        # (method, path) -> (handler, whether it writes)
+        self.routes = {
+            ("GET", "/menu"): (self._menu, False),
+            ("GET", "/queue"): (self._queue, False),
+            ("GET", "/stats"): (self._stats, False),
+            ("POST", "/price"): (self._price, False),
+            ("POST", "/menu/reload"): (self._reload, False),
+            ("POST", "/orders"): (self._place, True),
+            ("POST", "/queue/advance"): (self._advance, True),
+            ("POST", "/queue/prepare"): (lambda body: self._step("Waiting", "Preparing"), True),
+            ("POST", "/queue/serve"): (lambda body: self._step("Preparing", "Served"), True),
+        }
+
+    # ===== Lifecycle =====
+
+    async def serve(self):
+        """Accept connections until cancelled"""
+        self._commands = asyncio.Queue()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        drain = asyncio.create_task(self._drain())
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            drain.cancel()
+
+    def close(self):
+        """Stop the writer thread and close its connection"""
+        # The connection belongs to the writer thread, so close it there
+        self._writer.submit(connection_manager.close)
+        self._writer.shutdown(wait=True)
+
+    # ===== HTTP =====
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    status, payload = 413, {"error": "Request body too large"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self._dispatch(method, urlsplit(target).path, body)
+                    keep_alive = (version == "HTTP/1.1"
+                                  and headers.get("connection", "").lower() != "close")
+
+                data = json.dumps(payload, default=str).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # Client went away or sent something that is not HTTP
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, raw_body):
+        route = self.routes.get((method, path.rstrip("/") or "/"))
+        if route is None:
+            return 404, {"error": f"No route for {method} {path}"}
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            return 400, {"error": "Body is not valid JSON"}
+        if not isinstance(body, dict):
+            return 400, {"error": "Body must be a JSON object"}
+
+        handler, writes = route
+        command = _Command(handler, body, writes, asyncio.get_running_loop().create_future())
+        await self._commands.put(command)
+        try:
+            return await command.future
+        except Exception as e:
+            traceback.print_exc()
+            return 500, {"error": str(e)}
+
+    # ===== Writer =====
+
+    async def _drain(self):
+        """Feed queued commands to the writer thread, one batch at a time"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._commands.get()]
+            while len(batch) < self.batch_size and not self._commands.empty():
+                batch.append(self._commands.get_nowait())
+            try:
+                results = await loop.run_in_executor(self._writer, self._apply, batch)
+            except Exception as e:
+                for command in batch:
+                    if not command.future.done():
+                        command.future.set_exception(e)
+                continue
+            for command, result in zip(batch, results):
+                if not command.future.done():
+                    command.future.set_result(result)
+
+    def _apply(self, batch):
+        """Run one batch on the writer thread; returns (status, payload) per command"""
+        self.stats["batches"] += 1
+        self.stats["commands"] += len(batch)
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+
+        results = {}
+        for command in batch:
+            if not command.writes:
+                results[command] = self._call(command)
+
+        writes = [command for command in batch if command.writes]
+        if writes:
+            self._events.clear()
+            failed = False
+            try:
+                with db_connection(immediate=True) as conn:
+                    for command in writes:
+                        conn.execute("SAVEPOINT command")
+                        events_before = len(self._events)
+                        try:
+                            results[command] = self._call(command)
+                        except Exception as e:
+                            # Undo this command only; the rest of the batch still commits
+                            conn.execute("ROLLBACK TO command")
+                            del self._events[events_before:]
+                            failed = True
+                            if isinstance(e, sqlite3.Error):
+                                results[command] = (500, {"error": f"Database error: {e}"})
+                            else:
+                                traceback.print_exc()
+                                results[command] = (500, {"error": f"Order not saved: {e}"})
+                        conn.execute("RELEASE command")
+            except Exception as e:
+                # Nothing in the batch was committed; drop what it did in memory
+                self._events.clear()
+                self._resync()
+                for command in writes:
+                    results[command] = (503, {"error": f"Order not saved: {e}"})
+            else:
+                if failed:
+                    # A failed command may have touched memory before it raised
+                    self._resync()
+                events, self._events = self._events, []
+                for event, order in events:
+                    self.feed.publish(event, order)
+        return [results[command] for command in batch]
+
+    def _call(self, command):
+        try:
+            return command.handler(command.body)
+        except ApiError as e:
+            return e.http_status, e.payload
+
+    def _resync(self):
+        try:
+            self.service.catalog.load()
+            self.service.load()
+        except sqlite3.Error:
+            traceback.print_exc()
+
+    # ===== Handlers (writer thread) =====
+
+    def _menu(self, body):
+        catalog = self.service.catalog
+        products = sorted(catalog.all_products(), key=lambda p: (p.category, p.subcategory, p.name))
+        return 200, {
+            "products": [product_json(p) for p in products],
+            "addons": [addon_json(a) for a in catalog.all_addons()],
+        }
+
+    def _queue(self, body):
+        return 200, {
+            "orders": list(self.service.open_orders.values()),
+            "next_customer": self.service.customer_number,
+        }
+
+    def _stats(self, body):
+        return 200, dict(self.stats)
+
+    def _reload(self, body):
+        self.service.catalog.load()
+        return 200, {"products": len(self.service.catalog.all_products())}
+
+    def _price(self, body):
+        lines, skipped = self._priced_lines(body)
+        return 200, {"items": lines, "skipped_addons": skipped,
+                     "total": sum(line['price'] for line in lines)}
+
+    def _place(self, body):
+        lines, skipped = self._priced_lines(body)
+        service = body.get("service", "Dine-in")
+        if service not in SERVICE_TYPES:
+            raise ApiError(400, f"service must be one of {', '.join(SERVICE_TYPES)}")
+        result = self.service.place_order(lines, service, str(body.get("packaging", "None")))
+        if result.status != PLACED:
+            raise ApiError(409, "Not enough stock for this order", status=result.status,
+                           shortages=result.shortages)
+        return 201, {"status": PLACED, "order": result.order, "skipped_addons": skipped,
+                     "next_customer": self.service.customer_number}
+
+    def _advance(self, body):
+        step = (body.get("from"), body.get("to"))
+        if step not in QUEUE_STEPS:
+            raise ApiError(400, "from/to must be Waiting→Preparing or Preparing→Served")
+        return self._step(*step)
+
+    def _step(self, from_status, to_status):
+        return 200, {"order": self.service.advance(from_status, to_status)}
+
+    def _priced_lines(self, body):
+        """Price the posted items from the server's menu; the client's prices are ignored"""
+        items = body.get("items")
+        if not isinstance(items, list) or not items:
+            raise ApiError(400, "items must be a non-empty list", status=EMPTY_CART)
+        lines, skipped = [], []
+        for item in items:
+            if not isinstance(item, dict) or not isinstance(item.get("product_name"), str):
+                raise ApiError(400, "each item needs a product_name")
+            addons = item.get("addons") or []
+            if not isinstance(addons, list) or not all(isinstance(a, str) for a in addons):
+                raise ApiError(400, "addons must be a list of add-on names")
+            size = item.get("size", "Regular")
+            if size not in SIZES:
+                raise ApiError(400, f"size must be one of {', '.join(SIZES)}")
+            temperature = item.get("temperature", "Hot")
+            if temperature not in LINE_TEMPERATURES:
+                raise ApiError(400, f"temperature must be one of {', '.join(LINE_TEMPERATURES)}")
+            result = self.service.price_line(item["product_name"], size, temperature, addons)
+            if not result.ok:
+                raise ApiError(409, f"{item['product_name']} cannot be sold",
+                               status=result.status, product=item["product_name"])
+            lines.append(result.line)
+            skipped.extend(result.skipped_addons)
+        return lines, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared order server for several tills")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="most writes committed together")
+    parser.add_argument("--feed-port", type=int, default=FEED_PORT,
+                        help="kitchen display feed port (0 to disable)")
+    args = parser.parse_args()
+
+    init_db()
+    service = OrderService(MenuCatalog())
+    service.catalog.load()
+    service.load()
+    feed = None
+    if args.feed_port:
+        feed = OrderFeedPublisher(args.host, args.feed_port, service.open_orders.values())
+        feed.start()
+        print(f"Order feed on {args.host}:{args.feed_port}")
+    server = OrderServer(service, args.host, args.port, args.batch_size, feed)
+    print(f"Order server on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if feed is not None:
+            feed.close()
+        connection_manager.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+from checkout import StockShortageError
+from order_store import OrderQueueStore
+
+LARGE_SURCHARGE = 15
+TEMPERATURE_SUBCATEGORIES = ("Coffee", "Tea", "Drinks")
+# Options the POS offers; lines for food get NO_TEMPERATURE
+SIZES = ("Regular", "Large")
+TEMPERATURES = ("Hot", "Iced")
+NO_TEMPERATURE = "N/A"
+
+ADDED = "added"
+UNKNOWN_PRODUCT = "unknown_product"
+OUT_OF_STOCK = "out_of_stock"
+PLACED = "placed"
+EMPTY_CART = "empty_cart"
+STOCK_SHORTAGE = "stock_shortage"
+
+# Events passed to OrderService.listeners
+ORDER_PLACED = "placed"
+ORDER_STATUS = "status"
+
+
+def has_temperature(subcategory):
+    """Drinks are ordered hot or cold; food is not"""
+    return any(word in (subcategory or "") for word in TEMPERATURE_SUBCATEGORIES)
+
+
+class AddItemResult:
+    """Outcome of OrderService.add_item"""
+    __slots__ = ("status", "line", "skipped_addons")
+
+    def __init__(self, status, line=None, skipped_addons=()):
+        self.status = status
+        self.line = line
+        self.skipped_addons = list(skipped_addons)
+
+    @property
+    def ok(self):
+        return self.status == ADDED
+
+    def __repr__(self):
+        return f"AddItemResult({self.status!r}, skipped={self.skipped_addons})"
+
+
+class CheckoutResult:
+    """Outcome of OrderService.checkout; shortages as in StockShortageError"""
+    __slots__ = ("status", "order", "shortages")
+
+    def __init__(self, status, order=None, shortages=()):
+        self.status = status
+        self.order = order
+        self.shortages = list(shortages)
+
+    @property
+    def ok(self):
+        return self.status == PLACED
+
+    def __repr__(self):
+        return f"CheckoutResult({self.status!r}, order={self.order and self.order.get('id')})"
+
+
+class OrderService:
+    """Cart, pricing, stock and the order queue, with no Tk in sight.
+
+    CafeShopSystem drives this and turns the results into dialogs; the
+    benchmarks and the order server drive it directly. Reads come from the
+    MenuCatalog, writes go through OrderQueueStore. sqlite3.Error is left to
+    the caller, as everywhere else. Each callable in ``listeners`` is called
+    as listener(event, order) after an order is placed or changes status.
+    """
+
+    def __init__(self, catalog, queue_store=None):
+        self.catalog = catalog
+        self.queue_store = queue_store or OrderQueueStore()
+        self.cart = []
+        self.open_orders = {}
+        self.customer_number = 1
+        self.listeners = []
+
+    def load(self):
+        """Recover the open queue and customer numbering from the database"""
+        self.open_orders = self.queue_store.open_orders()
+        self.customer_number = self.queue_store.next_customer_number()
+
+    # ===== Cart & pricing =====
+
+    def price_line(self, product_name, size="Regular", temperature="Hot", addons=()):
+        """Build a priced cart line; returns an AddItemResult (not added to the cart)"""
+        product = self.catalog.product(product_name)
+        if product is None:
+            return AddItemResult(UNKNOWN_PRODUCT)
+        if product.stock <= 0:
+            return AddItemResult(OUT_OF_STOCK)
+
+        base_price = product.price
+        if size == "Large":
+            base_price += LARGE_SURCHARGE
+
+        selected, addon_prices, skipped = [], {}, []
+        for addon_name in addons:
+            addon = self.catalog.addon(addon_name)
+            if addon is None:
+                continue
+            if addon.stock <= 0:
+                skipped.append(addon_name)
+                continue
+            selected.append(addon_name)
+            addon_prices[addon_name] = addon.price
+        addons_cost = sum(addon_prices.values())
+
+        line = {
+            'product_name': product_name,
+            'size': size,
+            'temperature': temperature if has_temperature(product.subcategory) else NO_TEMPERATURE,
+            'addons': selected,
+            'addons_text': ", ".join(selected) if selected else "None",
+            'addon_prices': addon_prices,
+            'price': base_price + addons_cost,
+            'base_price': base_price,
+            'addons_cost': addons_cost,
+        }
+        return AddItemResult(ADDED, line, skipped)
+
+    def add_item(self, product_name, size="Regular", temperature="Hot", addons=()):
+        result = self.price_line(product_name, size, temperature, addons)
+        if result.ok:
+            self.cart.append(result.line)
+        return result
+
+    def remove_items(self, indices):
+        for index in sorted(set(indices), reverse=True):
+            if 0 <= index < len(self.cart):
+                self.cart.pop(index)
+
+    def clear_cart(self):
+        self.cart = []
+
+    def cart_total(self):
+        return sum(item['price'] for item in self.cart)
+
+    # ===== Checkout & queue =====
+
+    def checkout(self, service="Dine-in", packaging="None"):
+        """Place the cart as the next customer's order and empty the cart"""
+        if not self.cart:
+            return CheckoutResult(EMPTY_CART)
+        result = self.place_order(self.cart, service, packaging)
+        if result.ok:
+            self.cart = []
+        return result
+
+    def place_order(self, items, service="Dine-in", packaging="None", customer=None):
+        """Reserve stock and enqueue ``items``; numbers the customer unless given"""
+        order = {
+            "customer": customer or f"#{self.customer_number}",
+            "items": list(items),
+            "service": service,
+            "packaging": packaging if service == "Take-out" else "None",
+            "total": sum(item['price'] for item in items),
+            "status": "Waiting",
+        }
+        try:
+            sold_products, sold_addons = self.queue_store.place(order)
+        except StockShortageError as e:
+            return CheckoutResult(STOCK_SHORTAGE, order, e.shortages)
+        self.catalog.apply_sale(sold_products, sold_addons)
+        self.open_orders[order["id"]] = order
+        if customer is None:
+            self.customer_number += 1
+        self._notify(ORDER_PLACED, order)
+        return CheckoutResult(PLACED, order)
+
+    def advance(self, from_status, to_status):
+        """Move the oldest order in from_status along; returns the order or None"""
+        order_id = self.queue_store.advance(from_status, to_status)
+        if order_id is None:
+            return None
+        order = self.open_orders.get(order_id) or self.queue_store.load_order(order_id)
+        if order is None:
+            return None
+        order["status"] = to_status
+        if to_status == "Served":
+            self.open_orders.pop(order_id, None)
+        self._notify(ORDER_STATUS, order)
+        return order
+
+    def prepare_next(self):
+        return self.advance("Waiting", "Preparing")
+
+    def serve_next(self):
+        return self.advance("Preparing", "Served")
+
+    def _notify(self, event, order):
+        for listener in self.listeners:
+            listener(event, order)
@@ -0,0 +1,228 @@
+from datetime import datetime
+
+from checkout import reserve_stock
+from database import db_connection
+
+OPEN_STATUSES = ("Waiting", "Preparing")
+
+
+def insert_order(conn, order, order_time):
+    """Insert the order header row and return its id.
+
+    order_name/add_ons keep the joined summary the receipt and older reports
+    use; per-item detail lives in sales_history.
+    """
+    cursor = conn.execute("""
+        INSERT INTO orders (
+            customer_number, order_name, add_ons, size, temperature,
+            service_type, packaging_type, total, status, order_time
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        order["customer"],
+        ", ".join([item['product_name'] for item in order["items"]]),
+        ", ".join([item['addons_text'] for item in order["items"]]),
+        order["items"][0]['size'] if order["items"] else "Regular",
+        order["items"][0]['temperature'] if order["items"] else "Hot",
+        order["service"],
+        order["packaging"],
+        order["total"],
+        order["status"],
+        order_time
+    ))
+    return cursor.lastrowid
+
+
+def line_item_rows(order_id, order, sale_time):
+    """One sales_history row per cart line and one per add-on on that line"""
+    rows = []
+    for item in order["items"]:
+        common = (order["customer"], item['product_name'])
+        tail = (item['size'], item['temperature'],
+                order["service"], order["packaging"], sale_time)
+        rows.append((order_id, *common, None, 1,
+                     item['base_price'], item['base_price'], *tail))
+        addon_prices = item.get('addon_prices', {})
+        for addon in item['addons']:
+            price = addon_prices.get(addon, 0)
+            rows.append((order_id, *common, addon, 1, price, price, *tail))
+    return rows
+
+
+def insert_line_items(conn, order_id, order, sale_time):
+    conn.executemany("""
+        INSERT INTO sales_history (
+            order_id, customer_number, product_name, addon_name, quantity,
+            unit_price, total_price, size, temperature,
+            service_type, packaging_type, sale_time
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, line_item_rows(order_id, order, sale_time))
+
+
+def save_order(order):
+    """Write an order and its line items in one transaction; returns the order id"""
+    now = datetime.now()
+    with db_connection(immediate=True) as conn:
+        order_id = insert_order(conn, order, now)
+        insert_line_items(conn, order_id, order, now)
+    return order_id
+
+
+def sales_totals(conn):
+    """(served order count, revenue), summed from the daily rollup"""
+    count, revenue = conn.execute(
+        "SELECT SUM(order_count), SUM(revenue) FROM sales_daily"
+    ).fetchone()
+    return count or 0, revenue or 0
+
+
+def popular_products(conn, limit=5):
+    """Best sellers by units in served orders, from the daily per-product rollup"""
+    return conn.execute("""
+        SELECT product_name, SUM(quantity) AS sold
+        FROM product_sales_daily
+        GROUP BY product_name
+        HAVING sold > 0
+        ORDER BY sold DESC
+        LIMIT ?
+    """, (limit,)).fetchall()
+
+
+def busiest_hours(conn, limit=3):
+    """Hours of the day with the most served orders, from the hourly rollup"""
+    return conn.execute("""
+        SELECT substr(hour, 12, 2) AS hour_of_day, SUM(order_count) AS served
+        FROM sales_hourly
+        WHERE hour <> 'unknown'
+        GROUP BY hour_of_day
+        ORDER BY served DESC
+        LIMIT ?
+    """, (limit,)).fetchall()
+
+
+def sales_report(conn):
+    """Everything show_sales_report displays, read in one go"""
+    order_count, revenue = sales_totals(conn)
+    return {
+        "order_count": order_count,
+        "revenue": revenue,
+        "popular": popular_products(conn),
+        "peak_hours": busiest_hours(conn),
+    }
+
+
+class OrderQueueStore:
+    """The Waiting/Preparing queue, persisted in the orders table.
+
+    Orders are written at checkout, so a crash or restart loses nothing;
+    status changes are single indexed UPDATEs.
+    """
+
+    def place(self, order):
+        """Deduct stock and enqueue the order in one transaction.
+
+        Sets order["id"] and returns the (products, addons) quantities sold.
+        Raises checkout.StockShortageError without writing anything.
+        """
+        with db_connection(immediate=True):
+            sold = reserve_stock(order["items"])
+            order["id"] = save_order(order)
+        return sold
+
+    def advance(self, from_status, to_status):
+        """Move the oldest order in from_status to to_status; returns its id or None"""
+        with db_connection(immediate=True) as conn:
+            row = conn.execute(
+                "SELECT id FROM orders WHERE status = ? ORDER BY id LIMIT 1",
+                (from_status,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE orders SET status = ? WHERE id = ?", (to_status, row[0]))
+        return row[0]
+
+    def open_orders(self):
+        """Rebuild the in-flight queue from the database, oldest first"""
+        placeholders = ", ".join("?" * len(OPEN_STATUSES))
+        with db_connection() as conn:
+            headers = conn.execute(
+                f"SELECT id, customer_number, service_type, packaging_type, total, status "
+                f"FROM orders WHERE id IN (SELECT id FROM orders WHERE status IN ({placeholders})) "
+                f"ORDER BY id",
+                OPEN_STATUSES
+            ).fetchall()
+            lines = conn.execute(
+                f"SELECT order_id, product_name, addon_name, unit_price, size, temperature "
+                f"FROM sales_history WHERE order_id IN "
+                f"(SELECT id FROM orders WHERE status IN ({placeholders})) "
+                f"ORDER BY order_id, id",
+                OPEN_STATUSES
+            ).fetchall()
+        return self._assemble(headers, lines)
+
+    def load_order(self, order_id):
+        with db_connection() as conn:
+            headers = conn.execute(
+                "SELECT id, customer_number, service_type, packaging_type, total, status "
+                "FROM orders WHERE id = ?", (order_id,)
+            ).fetchall()
+            lines = conn.execute(
+                "SELECT order_id, product_name, addon_name, unit_price, size, temperature "
+                "FROM sales_history WHERE order_id = ? ORDER BY id", (order_id,)
+            ).fetchall()
+        orders = self._assemble(headers, lines)
+        return orders.get(order_id)
+
+    def next_customer_number(self):
+        """Continue numbering from the most recent order"""
+        with db_connection() as conn:
+            row = conn.execute(
+                "SELECT customer_number FROM orders ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+        try:
+            return int(str(row[0]).lstrip("#")) + 1
+        except (TypeError, ValueError):
+            return 1
+
+    @staticmethod
+    def _assemble(headers, lines):
+        """Turn orders + sales_history rows back into the order dicts the UI uses"""
+        orders = {}
+        for order_id, customer, service, packaging, total, status in headers:
+            orders[order_id] = {
+                "id": order_id,
+                "customer": customer,
+                "items": [],
+                "service": service,
+                "packaging": packaging,
+                "total": total,
+                "status": status,
+            }
+
+        for order_id, product_name, addon_name, unit_price, size, temperature in lines:
+            order = orders.get(order_id)
+            if order is None:
+                continue
+            if addon_name is None:
+                order["items"].append({
+                    'product_name': product_name,
+                    'size': size,
+                    'temperature': temperature,
+                    'addons': [],
+                    'addon_prices': {},
+                    'base_price': unit_price,
+                    'addons_cost': 0,
+                    'price': unit_price,
+                })
+            elif order["items"]:
+                item = order["items"][-1]
+                item['addons'].append(addon_name)
+                item['addon_prices'][addon_name] = unit_price
+                item['addons_cost'] += unit_price
+                item['price'] += unit_price
+
+        for order in orders.values():
+            for item in order["items"]:
+                item['addons_text'] = ", ".join(item['addons']) if item['addons'] else "None"
+        return orders
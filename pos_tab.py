@@ -1,6 +1,8 @@
 import customtkinter as ctk
 from tkinter import ttk
 
+from order_service import SIZES, TEMPERATURES
+
 
 def setup_pos_tab(app):
     """Setup Point of Sale tab"""
@@ -62,19 +64,9 @@ def setup_pos_tab(app):
         products_container, bg="#f0f0f0", highlightthickness=0)
     scrollbar = ttk.Scrollbar(
         products_container, orient="vertical", command=app.products_canvas.yview)
-    app.products_scrollable_frame = ctk.CTkFrame(app.products_canvas)
-
-    app.products_scrollable_frame.bind(
-        "<Configure>",
-        lambda e: app.products_canvas.configure(
-            scrollregion=app.products_canvas.bbox("all"))
-    )
-
-    app.products_canvas.create_window(
-        (0, 0), window=app.products_scrollable_frame, anchor="nw")
-    app.products_canvas.configure(yscrollcommand=scrollbar.set)
     app.products_canvas.pack(side="left", fill="both", expand=True)
     scrollbar.pack(side="right", fill="y")
+    app.product_grid = ProductGrid(app, app.products_canvas, scrollbar)
 
     bottom_section = ctk.CTkFrame(right_frame, height=350)
     bottom_section.pack(fill="x", pady=(5, 0))
@@ -108,7 +100,7 @@ def setup_pos_tab(app):
                  font=("Arial", 12, "bold")).pack(anchor="w", pady=2)
 
     app.size_var = ctk.StringVar(value="Regular")
-    for size in ["Regular", "Large"]:
+    for size in SIZES:
         ctk.CTkRadioButton(
             size_frame, text=size, variable=app.size_var, value=size
         ).pack(anchor="w", pady=1)
@@ -120,7 +112,7 @@ def setup_pos_tab(app):
                  font=("Arial", 12, "bold")).pack(anchor="w", pady=2)
 
     app.temp_var = ctk.StringVar(value="Hot")
-    for temp in ["Hot", "Iced"]:
+    for temp in TEMPERATURES:
         ctk.CTkRadioButton(
             app.temp_frame, text=temp, variable=app.temp_var, value=temp
         ).pack(anchor="w", pady=1)
@@ -134,6 +126,7 @@ def setup_pos_tab(app):
     app.addons_container = ctk.CTkScrollableFrame(
         addons_frame, height=120, border_width=2, border_color="#dddddd")
     app.addons_container.pack(fill="both", expand=True, pady=2)
+    app.addon_list = AddonList(app.addons_container)
 
     action_frame = ctk.CTkFrame(right_options)
     action_frame.pack(fill="both", expand=True, pady=5)
@@ -208,10 +201,258 @@ def setup_pos_tab(app):
         width=140, fg_color="#2e8b57"
     ).pack(side="left", padx=5)
 
-    ctk.CTkLabel(
-        app.selected_product_frame,
-        text="Select a product from the menu",
-        font=("Arial", 12)
-    ).pack(pady=10)
+    app.selected_banner = SelectedProductBanner(app, app.selected_product_frame)
 
     app.select_category("Coffee")
+
+
+CATEGORY_ICONS = {
+    "Coffee": "☕",
+    "Sweet Treats": "🍰",
+    "Tea": "🍵",
+    "Hot Beverages": "🔥",
+    "Cold Beverages": "❄️",
+}
+
+
+class ProductCard:
+    """One reusable product card; bind() repoints it at a different product"""
+
+    WIDTH = 220
+    HEIGHT = 260
+    IMAGE_SIZE = (140, 100)
+
+    def __init__(self, app, canvas):
+        self.app = app
+        self.product = None
+        self.frame = ctk.CTkFrame(canvas, width=self.WIDTH, height=self.HEIGHT)
+        self.frame.pack_propagate(False)
+
+        self.image_label = ctk.CTkLabel(self.frame, text="", font=("Arial", 35))
+        self.image_label.pack(pady=6)
+        self.name_label = ctk.CTkLabel(
+            self.frame, font=("Arial", 13, "bold"), wraplength=200)
+        self.name_label.pack(pady=2)
+        self.subcategory_label = ctk.CTkLabel(
+            self.frame, font=("Arial", 10), text_color="#666666")
+        self.subcategory_label.pack(pady=1)
+        self.price_label = ctk.CTkLabel(
+            self.frame, font=("Arial", 12, "bold"), text_color="#8B4513")
+        self.price_label.pack(pady=1)
+        self.stock_label = ctk.CTkLabel(
+            self.frame, font=("Arial", 10), text_color="#666666")
+        self.stock_label.pack(pady=1)
+        self.select_button = ctk.CTkButton(
+            self.frame, text="SELECT", width=180,
+            fg_color="#8B4513", hover_color="#A0522D",
+            command=self._on_select)
+        self.select_button.pack(pady=6)
+
+        self.window_id = canvas.create_window(0, 0, window=self.frame, anchor="nw")
+
+    def bind(self, product):
+        self.product = product
+        self.name_label.configure(text=product.name)
+        self.subcategory_label.configure(text=product.subcategory)
+        self.price_label.configure(text=f"₱{product.price}")
+        self.stock_label.configure(text=f"Stock: {product.stock}")
+
+        manager = self.app.image_manager
+        try:
+            self.image_label.configure(image=manager.placeholder(self.IMAGE_SIZE), text="")
+            manager.get_image_preview_async(
+                self.app.root, product.image_path, self.IMAGE_SIZE,
+                lambda photo, p=product: self._set_image(p, photo)
+            )
+        except Exception:
+            icon = CATEGORY_ICONS.get(product.category, "🥪")
+            self.image_label.configure(image=None, text=icon)
+
+    def _set_image(self, product, photo):
+        # The card may have been recycled for another product while loading
+        if self.product is product:
+            self.image_label.configure(image=photo, text="")
+
+    def _on_select(self):
+        if self.product is not None:
+            self.app.select_product(self.product.name, self.product.subcategory)
+
+
+class ProductGrid:
+    """Virtualized product grid drawn directly on the POS canvas.
+
+    Only cards for the rows in view (plus OVERSCAN rows either side) exist;
+    scrolling moves and rebinds the same card widgets instead of building one
+    per product, so a category with hundreds of SKUs costs the same to show
+    as one with a dozen.
+    """
+
+    COLUMNS = 3
+    PADDING = 8
+    OVERSCAN = 1
+    CELL_WIDTH = ProductCard.WIDTH + 2 * PADDING
+    CELL_HEIGHT = ProductCard.HEIGHT + 2 * PADDING
+
+    def __init__(self, app, canvas, scrollbar):
+        self.app = app
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.products = []
+        self._visible = {}
+        self._free = []
+        self._message_id = canvas.create_text(
+            20, 50, anchor="w", font=("Arial", 16), text="", state="hidden")
+
+        canvas.configure(yscrollcommand=self._on_scroll)
+        canvas.bind("<Configure>", lambda _e: self.render())
+
+    @property
+    def row_count(self):
+        return -(-len(self.products) // self.COLUMNS)
+
+    def show(self, products, empty_message=""):
+        """Replace the grid contents and scroll back to the top"""
+        self.products = list(products)
+        height = self.row_count * self.CELL_HEIGHT
+        self.canvas.configure(scrollregion=(0, 0, self.COLUMNS * self.CELL_WIDTH, height))
+        self.canvas.itemconfigure(
+            self._message_id, text=empty_message,
+            state="hidden" if self.products else "normal")
+        for card in self._visible.values():
+            self._release(card)
+        self._visible.clear()
+        self.canvas.yview_moveto(0)
+        self.render()
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.render()
+
+    def visible_range(self):
+        """Product indices that need a card: rows in view plus overscan"""
+        if not self.products:
+            return range(0)
+        top = self.canvas.canvasy(0)
+        bottom = top + max(self.canvas.winfo_height(), self.CELL_HEIGHT)
+        first_row = max(int(top // self.CELL_HEIGHT) - self.OVERSCAN, 0)
+        last_row = min(int(bottom // self.CELL_HEIGHT) + self.OVERSCAN, self.row_count - 1)
+        return range(first_row * self.COLUMNS,
+                     min((last_row + 1) * self.COLUMNS, len(self.products)))
+
+    def render(self):
+        wanted = self.visible_range()
+        for index in [i for i in self._visible if i not in wanted]:
+            self._release(self._visible.pop(index))
+
+        for index in wanted:
+            if index in self._visible:
+                continue
+            card = self._free.pop() if self._free else ProductCard(self.app, self.canvas)
+            row, col = divmod(index, self.COLUMNS)
+            self.canvas.coords(card.window_id,
+                               col * self.CELL_WIDTH + self.PADDING,
+                               row * self.CELL_HEIGHT + self.PADDING)
+            self.canvas.itemconfigure(card.window_id, state="normal")
+            card.bind(self.products[index])
+            self._visible[index] = card
+
+    def _release(self, card):
+        card.product = None
+        self.canvas.itemconfigure(card.window_id, state="hidden")
+        # Also park it outside the scroll region; some Tk builds draw hidden windows
+        self.canvas.coords(card.window_id, -2 * self.CELL_WIDTH, 0)
+        self._free.append(card)
+
+
+class SelectedProductBanner:
+    """The "Selected: ..." strip, built once and reconfigured on every click"""
+
+    IMAGE_SIZE = (45, 45)
+
+    def __init__(self, app, parent):
+        self.app = app
+        self.prompt_label = ctk.CTkLabel(
+            parent, text="Select a product from the menu", font=("Arial", 12))
+
+        self.info_frame = ctk.CTkFrame(parent)
+        self.image_label = ctk.CTkLabel(self.info_frame, text="", font=("Arial", 18))
+        self.image_label.pack(side="left", padx=8)
+
+        details_frame = ctk.CTkFrame(self.info_frame)
+        details_frame.pack(side="left", fill="both", expand=True, padx=8)
+        self.name_label = ctk.CTkLabel(details_frame, font=("Arial", 12, "bold"))
+        self.name_label.grid(row=0, column=0, sticky="w", pady=1)
+        self.price_label = ctk.CTkLabel(details_frame, font=("Arial", 11))
+        self.price_label.grid(row=1, column=0, sticky="w", pady=1)
+        self.stock_label = ctk.CTkLabel(details_frame, font=("Arial", 11))
+        self.stock_label.grid(row=2, column=0, sticky="w", pady=1)
+        self.type_label = ctk.CTkLabel(details_frame, font=("Arial", 11))
+        self.type_label.grid(row=3, column=0, sticky="w", pady=1)
+
+        self._showing_product = True
+        self.clear()
+
+    def show(self, product, subcategory, icon):
+        try:
+            photo = self.app.image_manager.get_image_preview(product.image_path, size=self.IMAGE_SIZE)
+            self.image_label.configure(image=photo, text="")
+        except Exception:
+            self.image_label.configure(image=None, text=icon)
+
+        self.name_label.configure(text=f"Selected: {product.name}")
+        self.price_label.configure(text=f"Price: ₱{product.price}")
+        self.stock_label.configure(text=f"Stock: {product.stock}")
+        self.type_label.configure(text=f"Type: {subcategory}")
+
+        if not self._showing_product:
+            self.prompt_label.pack_forget()
+            self.info_frame.pack(fill="both", expand=True, padx=5, pady=5)
+            self._showing_product = True
+
+    def clear(self):
+        if self._showing_product:
+            self.info_frame.pack_forget()
+            self.prompt_label.pack(pady=10)
+            self._showing_product = False
+
+
+class AddonList:
+    """Pool of add-on checkboxes reused across product selections"""
+
+    def __init__(self, parent):
+        self.parent = parent
+        self._rows = []
+        self._shown = 0
+        self.empty_label = ctk.CTkLabel(
+            parent, text="No add-ons available for this category", font=("Arial", 10))
+
+    def show(self, addons):
+        """Display one checkbox per add-on; returns {name: BooleanVar}"""
+        self.empty_label.pack_forget()
+        while len(self._rows) < len(addons):
+            var = ctk.BooleanVar()
+            checkbox = ctk.CTkCheckBox(self.parent, variable=var, font=("Arial", 11))
+            self._rows.append((checkbox, var))
+
+        for checkbox, _var in self._rows[len(addons):self._shown]:
+            checkbox.pack_forget()
+
+        addon_vars = {}
+        for (checkbox, var), addon in zip(self._rows, addons):
+            var.set(False)
+            checkbox.configure(text=f"{addon.name} (+₱{addon.price})")
+            addon_vars[addon.name] = var
+        # Rows below len(addons) that were hidden are re-packed in order
+        for checkbox, _var in self._rows[self._shown:len(addons)]:
+            checkbox.pack(anchor="w", pady=2)
+        self._shown = len(addons)
+
+        if not addons:
+            self.empty_label.pack(pady=10)
+        return addon_vars
+
+    def clear(self):
+        for checkbox, _var in self._rows[:self._shown]:
+            checkbox.pack_forget()
+        self._shown = 0
+        self.empty_label.pack_forget()
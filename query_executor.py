@@ -0,0 +1,119 @@
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from tkinter import TclError
+
+from database import DB_FILE, ConnectionManager
+
+
+class _QueryJob:
+    __slots__ = ("scope", "future", "cancelled")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.future = None
+        self.cancelled = False
+
+
+class QueryExecutor:
+    """Run report and inventory queries off the Tk thread.
+
+    A single worker thread owns a read-only connection, so long analytical
+    reads never hold the write lock or stall the POS. ``submit`` takes a
+    callable that receives that connection and returns a Future; the result
+    (or the exception it raised) is handed back to the Tk thread through
+    root.after.
+    Work submitted under a ``scope`` (usually the window that asked for it)
+    can be dropped with ``cancel(scope)``: queued jobs are cancelled, a
+    running query is interrupted, and no callback fires for either.
+    """
+
+    def __init__(self, root, db_file=DB_FILE):
+        self.root = root
+        self._connections = ConnectionManager(db_file, read_only=True)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._scopes = {}
+        self._running = None
+        self._conn = None
+
+    def submit(self, query, on_result, on_error=None, scope=None):
+        """Run query(conn) on the worker; call on_result(value) on the Tk thread.
+
+        If the query raises, on_error(exception) is called instead; without
+        an on_error the exception is raised in the Tk callback.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query")
+        job = _QueryJob(scope)
+        with self._lock:
+            job.future = self._executor.submit(self._run, query, job)
+            self._scopes.setdefault(scope, []).append(job)
+        job.future.add_done_callback(lambda _f: self._schedule(job, on_result, on_error))
+        return job.future
+
+    def cancel(self, scope):
+        """Drop every job submitted under scope, interrupting the one running"""
+        with self._lock:
+            jobs = self._scopes.pop(scope, [])
+        for job in jobs:
+            self._cancel_job(job)
+
+    def shutdown(self):
+        """Cancel everything, close the worker's connection and stop the thread"""
+        with self._lock:
+            jobs = [job for scoped in self._scopes.values() for job in scoped]
+            self._scopes.clear()
+        for job in jobs:
+            self._cancel_job(job)
+        if self._executor is not None:
+            # The connection belongs to the worker thread, so close it there
+            self._executor.submit(self._connections.close)
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _cancel_job(self, job):
+        # Not under self._lock: Future.cancel() runs the done callbacks inline
+        job.cancelled = True
+        if job.future.cancel():
+            return
+        with self._lock:
+            if self._running is job:
+                self._conn.interrupt()
+
+    def _run(self, query, job):
+        with self._lock:
+            if job.cancelled:
+                raise CancelledError()
+            self._conn = self._connections.get()
+            self._running = job
+        try:
+            return query(self._conn)
+        finally:
+            with self._lock:
+                self._running = None
+
+    def _schedule(self, job, on_result, on_error):
+        with self._lock:
+            jobs = self._scopes.get(job.scope)
+            if jobs and job in jobs:
+                jobs.remove(job)
+                if not jobs:
+                    del self._scopes[job.scope]
+        if job.cancelled:
+            return
+        try:
+            self.root.after(0, self._deliver, job, on_result, on_error)
+        except (RuntimeError, TclError):
+            # The main window is gone
+            pass
+
+    def _deliver(self, job, on_result, on_error):
+        if job.cancelled:
+            return
+        error = job.future.exception()
+        if error is None:
+            on_result(job.future.result())
+        elif isinstance(error, Exception) and on_error is not None:
+            on_error(error)
+        else:
+            raise error
@@ -20,6 +20,7 @@ def setup_queue_tab(app):
     app.queue_tree.configure(yscrollcommand=scrollbar.set)
     app.queue_tree.pack(side="left", fill="both", expand=True)
     scrollbar.pack(side="right", fill="y")
+    app.queue_view = QueueView(app.queue_tree)
 
     control_frame = ctk.CTkFrame(app.queue_tab)
     control_frame.pack(fill="x", padx=10, pady=10)
@@ -35,6 +36,54 @@ def setup_queue_tab(app):
     ).pack(side="left", padx=5)
 
     ctk.CTkButton(
-        control_frame, text="🔄 Refresh Queue",
-        command=app.update_queue_display, width=200
+        control_frame, text="🖥️ Kitchen Display",
+        command=app.open_kitchen_display, width=200
     ).pack(side="left", padx=5)
+
+    app.feed_status_label = ctk.CTkLabel(app.queue_tab, text="Kitchen feed: starting...", anchor="w")
+    app.feed_status_label.pack(fill="x", padx=10, pady=(0, 10))
+
+
+def queue_row(order):
+    """Column values shown for an order in the queue tree"""
+    return (
+        order["customer"],
+        ", ".join([i['product_name'] for i in order["items"]]),
+        order["service"],
+        order["packaging"],
+        order["status"],
+    )
+
+
+class QueueView:
+    """Keep the queue Treeview in step with the order queue by applying diffs.
+
+    Tracks order id -> (tree item id, shown values) so a refresh only inserts
+    new orders, rewrites rows whose values changed and deletes served ones,
+    instead of clearing and re-inserting every row.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._rows = {}
+
+    def sync(self, orders):
+        """Apply the difference between the tree and ``orders`` (id -> order)"""
+        gone = [order_id for order_id in self._rows if order_id not in orders]
+        if gone:
+            self.tree.delete(*[self._rows.pop(order_id)[0] for order_id in gone])
+
+        for order_id, order in orders.items():
+            values = queue_row(order)
+            row = self._rows.get(order_id)
+            if row is None:
+                item_id = self.tree.insert("", "end", values=values)
+                self._rows[order_id] = (item_id, values)
+            elif row[1] != values:
+                self.tree.item(row[0], values=values)
+                self._rows[order_id] = (row[0], values)
+
+    def clear(self):
+        if self._rows:
+            self.tree.delete(*[item_id for item_id, _values in self._rows.values()])
+        self._rows.clear()
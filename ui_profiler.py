@@ -0,0 +1,190 @@
+import functools
+import inspect
+import math
+import os
+import sys
+import threading
+import time
+import traceback
+from tkinter import filedialog, messagebox
+
+PROFILE_UI_ENV = "CAFE_PROFILE_UI"
+SLOW_MS_ENV = "CAFE_PROFILE_UI_SLOW_MS"
+SLOW_MS = 100
+SUMMARY_HOTKEY = "<F12>"
+
+# Histogram buckets grow by 25% from 0.1 ms, so percentiles are within a bucket
+HISTOGRAM_BASE_MS = 0.1
+HISTOGRAM_GROWTH = 1.25
+
+# Modal dialogs wait on the user, not the till; their time is not counted
+DIALOGS = (
+    (messagebox, ("showinfo", "showwarning", "showerror", "askyesno", "askquestion",
+                  "askokcancel", "askyesnocancel", "askretrycancel")),
+    (filedialog, ("askopenfilename", "askopenfilenames", "asksaveasfilename", "askdirectory")),
+)
+
+
+class LatencyHistogram:
+    """Log-bucketed latencies: fixed memory however many calls are recorded"""
+    __slots__ = ("buckets", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        index = max(0, math.ceil(math.log(max(ms, HISTOGRAM_BASE_MS) / HISTOGRAM_BASE_MS,
+                                          HISTOGRAM_GROWTH)))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th percentile, capped at the max"""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(pct / 100 * self.count)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(HISTOGRAM_BASE_MS * HISTOGRAM_GROWTH ** index, self.max_ms)
+        return self.max_ms
+
+
+class _Call:
+    __slots__ = ("name", "thread_id", "start", "waited", "dialog_start", "sample")
+
+    def __init__(self, name, thread_id):
+        self.name = name
+        self.thread_id = thread_id
+        self.start = time.perf_counter()
+        self.waited = 0.0
+        self.dialog_start = None
+        self.sample = None
+
+    def busy_ms(self, now):
+        return (now - self.start - self.waited) * 1000
+
+
+class CallbackProfiler:
+    """Time Tk callbacks per handler and catch the ones that freeze the till.
+
+    ``instrument`` swaps an object's public methods for timed wrappers, so
+    it has to run before the widgets that use them are built. Only the
+    outermost handler on the Tk thread is timed (add_to_cart, not the
+    refresh_cart it calls), and time spent in modal dialogs is left out.
+    A watchdog thread takes a stack sample of the Tk thread once a handler
+    has been busy for ``slow_ms``; when the handler returns it is reported
+    with that sample.
+    """
+
+    def __init__(self, slow_ms=SLOW_MS, out=None):
+        self.slow_ms = slow_ms
+        self.out = out or sys.stderr
+        self.stats = {}
+        self._tk_thread = threading.get_ident()
+        self._current = None
+        self._originals = []
+        self._stopped = threading.Event()
+        self._patch_dialogs()
+        threading.Thread(target=self._watch, name="ui-profiler", daemon=True).start()
+
+    def wrap(self, name, callback):
+        @functools.wraps(callback)
+        def timed(*args, **kwargs):
+            if (self._current is not None or self._stopped.is_set()
+                    or threading.get_ident() != self._tk_thread):
+                return callback(*args, **kwargs)
+            call = self._current = _Call(name, self._tk_thread)
+            try:
+                return callback(*args, **kwargs)
+            finally:
+                self._current = None
+                self._record(call, call.busy_ms(time.perf_counter()))
+        return timed
+
+    def instrument(self, obj, names=None, prefix=""):
+        """Replace obj's public methods (or ``names``) with timed wrappers"""
+        if names is None:
+            names = [name for name, member in inspect.getmembers(type(obj), inspect.isfunction)
+                     if not name.startswith("_")]
+        for name in names:
+            setattr(obj, name, self.wrap(prefix + name, getattr(obj, name)))
+        return names
+
+    def bind_hotkey(self, root, sequence=SUMMARY_HOTKEY):
+        root.bind_all(sequence, lambda _event: self.report())
+
+    def report(self):
+        """Print per-handler latency, slowest total first"""
+        rows = sorted(self.stats.items(), key=lambda item: item[1].total_ms, reverse=True)
+        print(f"\n{'handler':<32} {'calls':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+              f"{'max ms':>9} {'total ms':>10}", file=self.out)
+        for name, histogram in rows:
+            print(f"{name:<32} {histogram.count:>7} {histogram.percentile(50):>9.1f} "
+                  f"{histogram.percentile(95):>9.1f} {histogram.percentile(99):>9.1f} "
+                  f"{histogram.max_ms:>9.1f} {histogram.total_ms:>10.1f}", file=self.out)
+        self.out.flush()
+
+    def close(self):
+        """Stop the watchdog and put the dialog functions back"""
+        self._stopped.set()
+        for module, name, original in self._originals:
+            setattr(module, name, original)
+        self._originals = []
+
+    def _record(self, call, ms):
+        histogram = self.stats.get(call.name)
+        if histogram is None:
+            histogram = self.stats[call.name] = LatencyHistogram()
+        histogram.add(ms)
+        if ms >= self.slow_ms:
+            print(f"[ui-profiler] slow handler {call.name}: {ms:.0f} ms", file=self.out)
+            print(call.sample or "  (returned before a stack sample was taken)\n",
+                  end="", file=self.out)
+            self.out.flush()
+
+    def _watch(self):
+        interval = self.slow_ms / 2000
+        while not self._stopped.wait(interval):
+            call = self._current
+            if call is None or call.sample is not None or call.dialog_start is not None:
+                continue
+            if call.busy_ms(time.perf_counter()) >= self.slow_ms:
+                frame = sys._current_frames().get(call.thread_id)
+                if frame is not None and self._current is call:
+                    call.sample = "".join(traceback.format_stack(frame))
+
+    def _patch_dialogs(self):
+        for module, names in DIALOGS:
+            for name in names:
+                original = getattr(module, name, None)
+                if original is not None:
+                    self._originals.append((module, name, original))
+                    setattr(module, name, self._untimed(original))
+
+    def _untimed(self, dialog):
+        @functools.wraps(dialog)
+        def waiting(*args, **kwargs):
+            call = self._current
+            if call is None or call.dialog_start is not None:
+                return dialog(*args, **kwargs)
+            call.dialog_start = time.perf_counter()
+            try:
+                return dialog(*args, **kwargs)
+            finally:
+                call.waited += time.perf_counter() - call.dialog_start
+                call.dialog_start = None
+        return waiting
+
+
+def profiler_from_env():
+    """A CallbackProfiler if CAFE_PROFILE_UI is set, else None"""
+    if not os.environ.get(PROFILE_UI_ENV):
+        return None
+    return CallbackProfiler(float(os.environ.get(SLOW_MS_ENV) or SLOW_MS))